@@ -0,0 +1,383 @@
+import json
+import time
+import subprocess
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from numpy.random import default_rng
+
+from optimizer import Optimizer
+from parser import Parser
+from catalog import Catalog
+from optimizer_api import SilentTelegramHandler
+
+
+N_SUBSETS = 5  # random subsets of Optimizer.N_DISHES dishes per catalog
+SEED = 0
+
+SYNTHETIC_SIZES = (20, 50, 200, 1000)  # dishes in synthetic catalogs
+JOINT_N_DAYS = 2
+TIME_BUDGET = 10  # seconds of search per day for every mode, then the best set found by then is taken
+
+# solver modes with dishes given at once (None is the whole catalog) and whether small subsets
+# are solved by the meet-in-the-middle search instead of the mode's own one
+
+RUN_LIST = [
+    ("recursive", Optimizer.N_DISHES, False),
+    ("iterative", Optimizer.N_DISHES, False),
+    ("iterative", Optimizer.N_DISHES, True),
+    ("bounded", Optimizer.BOUNDED_N_DISHES, False),
+    ("exact", None, False),
+    ("joint", None, False),
+    ("heuristic", None, False),
+    ("pareto", None, False),
+]
+
+OUTPUT_PATH = Path(Path(__file__).parent, "..", "output")
+DISHLIST_PATH = Path(Path(__file__).parent, "..", "data", "dishlist.xlsx")
+
+
+def load_catalog(user_token, max_mass):
+
+    parser = Parser(
+        address=None,
+        phone_number=None,
+        parse_npq_only=True,
+        user_token=user_token,
+        n_days=1,
+        telegram_handler=SilentTelegramHandler(),
+        max_mass=max_mass,
+        logon_before_parsing=False,
+        headless=True,
+        n_drivers=1,
+        fetch_backend="selenium",
+        incremental_full_mode=False
+    )
+
+    parser.get_and_filter_data(save_dishlist=False)
+
+    return parser.catalog
+
+
+def load_food_restrictions(user_token):
+
+    config_path = Path(Path(__file__).parent, "..", "config", "config.json")
+
+    config = json.load(config_path.open(encoding="utf-8"))
+
+    if str(user_token) in config:
+        return config[str(user_token)]["food_restrictions"]
+
+    return next(iter(config.values()))["food_restrictions"]
+
+
+def create_synthetic_catalog(n_dishes, max_mass, rng):
+
+    # real dishes of the dishlist with shuffled nutrients, prices per gram and stock like in the parsed catalogs
+
+    dishlist_df = pd.read_excel(DISHLIST_PATH, index_col="name").dropna(
+        subset=["calories", "proteins", "fats", "carbohydrates", "mass"]
+    )
+
+    food_df = dishlist_df.iloc[rng.choice(dishlist_df.index.size, size=n_dishes)].reset_index(drop=True)
+
+    for column in ["calories", "proteins", "fats", "carbohydrates"]:
+        food_df[column] = food_df[column] * rng.uniform(0.8, 1.2, size=n_dishes)
+
+    food_df.index = [f"Synthetic dish {i_dish}" for i_dish in range(n_dishes)]
+    food_df.index.name = "name"
+
+    food_df["price"] = np.round(food_df["mass"] * rng.lognormal(np.log(1.1), 0.4, size=n_dishes))
+
+    # the same conversion as in Parser: nutrients per portion and no more portions than the maximum mass
+
+    food_df["quantity"] = np.minimum(rng.integers(1, 1000, size=n_dishes), max_mass // food_df["mass"])
+
+    food_df["calories"] = food_df["calories"] * food_df["mass"] / 100
+    food_df["proteins"] = food_df["proteins"] * food_df["mass"] / 100
+    food_df["fats"] = food_df["fats"] * food_df["mass"] / 100
+    food_df["carbo"] = food_df["carbohydrates"] * food_df["mass"] / 100
+
+    food_df = food_df[["price", "calories", "proteins", "fats", "carbo", "quantity", "link", "mass"]]
+
+    return Catalog.from_food_df(food_df.loc[food_df["quantity"] > 0])
+
+
+def create_optimizer(food_restrictions, solver_mode, n_days=1):
+
+    return Optimizer(
+        telegram_handler=SilentTelegramHandler(),
+        n_days=n_days,
+        calories_lower=food_restrictions["calories_lower"],
+        calories_upper=food_restrictions["calories_upper"],
+        proteins_lower=food_restrictions["proteins_lower"],
+        proteins_upper=food_restrictions["proteins_upper"],
+        fats_lower=food_restrictions["fats_lower"],
+        fats_upper=food_restrictions["fats_upper"],
+        carbo_lower=food_restrictions["carbo_lower"],
+        carbo_upper=food_restrictions["carbo_upper"],
+        start_min_price=food_restrictions["start_min_price"],
+        solver_mode=solver_mode,
+        sample_subsets=True,
+        sampling="stratified",
+        seed=SEED,
+        n_workers=1,
+        n_solutions=1,
+        time_budget=TIME_BUDGET,
+        solution_cache=None,
+        pareto_front=None,
+        plan_store=None
+    )
+
+
+def benchmark_node_throughput(catalog, food_restrictions, rng):
+
+    # both engines explore the same nodes, so the iterative one gives the node count for both;
+    # no search is started here, so subsets of N_DISHES are solved to the end without a deadline
+
+    recursive_optimizer = create_optimizer(food_restrictions, "recursive")
+    iterative_optimizer = create_optimizer(food_restrictions, "iterative")
+
+    table_optimizer = create_optimizer(food_restrictions, "recursive")
+    table_optimizer.use_transposition_table = True
+
+    for optimizer in (recursive_optimizer, iterative_optimizer, table_optimizer):
+        optimizer.use_meet_in_middle = False
+
+    result_list = []
+
+    for _ in range(N_SUBSETS):
+
+        number_vec = rng.choice(catalog.size, size=min(Optimizer.N_DISHES, catalog.size), replace=False)
+
+        sliced_catalog = catalog.select(number_vec)
+
+        start_time = time.perf_counter()
+        recursive_quantity_vec, recursive_price = recursive_optimizer.solve_subset(sliced_catalog)
+        recursive_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        table_quantity_vec, table_price = table_optimizer.solve_subset(sliced_catalog)
+        table_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        iterative_quantity_vec, iterative_price = iterative_optimizer.solve_subset(sliced_catalog)
+        iterative_time = time.perf_counter() - start_time
+
+        result_list.append({
+            "n_nodes": iterative_optimizer.n_nodes,
+            "recursive_time": recursive_time,
+            "iterative_time": iterative_time,
+            "table_time": table_time,
+            "table_hit_rate": table_optimizer.transposition_table.get_hit_rate(),
+            "table_n_cutoffs": table_optimizer.transposition_table.n_cutoffs,
+            "table_n_nodes": table_optimizer.transposition_table.n_nodes,
+            "table_n_saved_nodes": table_optimizer.transposition_table.n_saved_nodes,
+            "is_same_result": bool(
+                (recursive_price == iterative_price) and np.all(recursive_quantity_vec == iterative_quantity_vec)
+                and (recursive_price == table_price)
+            ),
+        })
+
+    return result_list
+
+
+def benchmark_solver_modes(catalog, food_restrictions, rng):
+
+    # every mode gets the same random subsets (the first dishes of one permutation), so that
+    # the recursive and the iterative modes solve the same subsets, and the bounded one solves their supersets
+
+    catalog = create_optimizer(food_restrictions, "exact").remove_dominated_dishes(catalog)
+
+    permutation_list = [rng.permutation(catalog.size) for _ in range(N_SUBSETS)]
+
+    result_list = []
+
+    for solver_mode, n_dishes, use_meet_in_middle in RUN_LIST:
+
+        optimizer = create_optimizer(food_restrictions, solver_mode, JOINT_N_DAYS if solver_mode == "joint" else 1)
+
+        optimizer.use_meet_in_middle = use_meet_in_middle
+
+        # the whole catalog is the same at every attempt
+
+        for i_subset, permutation_vec in enumerate(permutation_list if n_dishes is not None else permutation_list[:1]):
+
+            sliced_catalog = catalog.select(np.sort(permutation_vec[:n_dishes]))
+
+            start_time = time.perf_counter()
+
+            optimizer.start_search(optimizer.n_days)
+
+            if solver_mode == "joint":
+                _, min_price = optimizer.solve_days(sliced_catalog)
+            else:
+                _, min_price = optimizer.solve_subset(sliced_catalog)
+
+            result_list.append({
+                "solver_mode": solver_mode,
+                "engine": optimizer.engine,
+                "i_subset": i_subset,
+                "n_dishes": sliced_catalog.size,
+                "n_days": optimizer.n_days,
+                "time": time.perf_counter() - start_time,
+                "n_nodes": optimizer.n_nodes,
+                "price": float(min_price),
+                "is_found": bool(min_price < food_restrictions["start_min_price"] * optimizer.n_days),
+                "is_time_over": bool(time.time() > optimizer.deadline),
+            })
+
+            if solver_mode == "heuristic":
+                result_list[-1]["relaxation_price"] = optimizer.relaxation_price
+
+    # the heuristic price is compared with the optimal one of the exact solver on the same whole catalog
+    # (if it finished within its budget) and with the linear relaxation, whose gap is the upper bound
+    # reported without the exact search
+
+    exact_result = next(result for result in result_list if result["solver_mode"] == "exact")
+
+    for result in result_list:
+
+        if (result["solver_mode"] != "heuristic") or not result["is_found"]:
+            continue
+
+        if exact_result["is_found"] and not exact_result["is_time_over"]:
+            result["exact_gap"] = (result["price"] - exact_result["price"]) / exact_result["price"]
+
+        if result["relaxation_price"] is not None:
+            result["max_gap"] = (result["price"] - result["relaxation_price"]) / result["relaxation_price"]
+
+    return result_list
+
+
+def print_solver_modes(catalog_name, result_list):
+
+    print(f"{catalog_name}:", flush=True)
+
+    for result in result_list:
+
+        print(
+            f" - {result['solver_mode']} ({result['engine']}), "
+            f"subset {result['i_subset'] + 1}, {result['n_dishes']} dishes"
+            + ("" if result["n_days"] == 1 else f", {result['n_days']} days")
+            + f": {result['time']:.2f} sec, "
+            + ("" if result["n_nodes"] is None else f"{result['n_nodes']} nodes, ")
+            + (f"{result['price']:.0f} rubles" if result["is_found"] else "no set")
+            + (" (time budget is over)" if result["is_time_over"] else "")
+            + (f", {result['exact_gap']:.1%} more than the exact one" if "exact_gap" in result else "")
+            + (f" (at most {result['max_gap']:.1%} by the linear relaxation)" if "max_gap" in result else ""),
+            flush=True
+        )
+
+
+def get_commit():
+
+    try:
+
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+
+        return None
+
+
+def print_node_throughput(catalog_name, result_list):
+
+    print(f"{catalog_name}:", flush=True)
+
+    for result in result_list:
+
+        n_nodes = result["n_nodes"]
+
+        print(
+            f" - {n_nodes} nodes: "
+            f"recursive {n_nodes / result['recursive_time'] / 1e6:.2f} Mnodes/sec, "
+            f"iterative {n_nodes / result['iterative_time'] / 1e6:.2f} Mnodes/sec, "
+            f"speedup x{result['recursive_time'] / result['iterative_time']:.1f}, "
+            f"transposition table of the recursive search hit {result['table_hit_rate']:.1%}, "
+            f"cut {result['table_n_cutoffs']} subtrees, "
+            f"saved {result['table_n_saved_nodes']} nodes (explored {result['table_n_nodes']}) "
+            f"and took x{result['table_time'] / result['recursive_time']:.1f} time"
+            + ("" if result["is_same_result"] else " (DIFFERENT RESULTS!)"),
+            flush=True
+        )
+
+
+if __name__ == "__main__":
+
+    # runs every solver mode on all parsed catalogs and on synthetic ones and writes the results to
+    # output/benchmark_<commit>.json, so that runs of different commits can be compared;
+    # the recursive optimizer core is also compared with the iterative one on the parsed catalogs
+
+    global_rng = default_rng(SEED)
+
+    global_commit = get_commit()
+
+    global_catalog_list = []
+
+    for csv_path in sorted(OUTPUT_PATH.glob("*.csv")):
+
+        # catalogs written by the pipeline after filtering lie next to the parsed dishes
+
+        if csv_path.stem.endswith("_catalog"):
+            continue
+
+        global_user_token = csv_path.stem
+
+        global_food_restrictions = load_food_restrictions(global_user_token)
+
+        global_catalog = load_catalog(global_user_token, global_food_restrictions["max_mass"])
+
+        global_result_list = benchmark_solver_modes(global_catalog, global_food_restrictions, global_rng)
+        global_throughput_list = benchmark_node_throughput(global_catalog, global_food_restrictions, global_rng)
+
+        print_solver_modes(csv_path.name, global_result_list)
+        print_node_throughput(csv_path.name, global_throughput_list)
+
+        global_catalog_list.append({
+            "catalog": csv_path.name,
+            "n_dishes": global_catalog.size,
+            "solver_modes": global_result_list,
+            "node_throughput": global_throughput_list,
+        })
+
+    global_food_restrictions = load_food_restrictions(None)
+
+    for global_n_dishes in SYNTHETIC_SIZES:
+
+        global_catalog = create_synthetic_catalog(global_n_dishes, global_food_restrictions["max_mass"], global_rng)
+
+        global_result_list = benchmark_solver_modes(global_catalog, global_food_restrictions, global_rng)
+
+        print_solver_modes(f"synthetic {global_n_dishes}", global_result_list)
+
+        global_catalog_list.append({
+            "catalog": f"synthetic_{global_n_dishes}",
+            "n_dishes": global_catalog.size,
+            "solver_modes": global_result_list,
+        })
+
+    global_path = Path(OUTPUT_PATH, f"benchmark_{global_commit or 'unknown'}.json")
+
+    json.dump(
+        {
+            "commit": global_commit,
+            "datetime": datetime.now().isoformat(timespec="seconds"),
+            "seed": SEED,
+            "catalogs": global_catalog_list,
+        },
+        global_path.open("w", encoding="utf-8"),
+        indent=4
+    )
+
+    print(f"Results are written to {global_path}", flush=True)
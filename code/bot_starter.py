@@ -1,3 +1,4 @@
+import os
 import traceback
 import telebot
 
@@ -44,6 +45,26 @@ def handle_start(message):
         logon_before_parsing = False  # it is needed only for GitHub Actions,
         headless = True  # for debug
 
+        # "exact" finds the cheapest sets over the whole catalog, "bounded" searches over 100 random dishes,
+        # "recursive" and "iterative" search over 20 random ones, "heuristic" is fast but may be not optimal,
+        # "pareto" keeps the cheapest sets for nearby proteins_lower and calories_upper to answer their changes at once
+        # ("joint" optimizes all days at once, it is experimental: on whole catalogs it usually stops
+        # at its time budget)
+
+        solver_mode = "exact"
+        sample_subsets = False  # exact solver takes the whole catalog until the user rejects its set
+        sampling = "stratified"  # subsets take more dishes rich in nutrients which are hard to cover, or "uniform"
+        seed = None  # a seed of random subsets makes them reproducible (for debug)
+        n_workers = min(4, os.cpu_count() or 1)  # random subsets solved in parallel processes at each attempt
+        n_solutions = 10  # cheapest sets kept by exact and joint solvers, they are shown after rejections
+        time_budget = None  # seconds of search per day, then the best set found by then is shown (None is unlimited)
+        use_solution_cache = True  # accepted sets are reused for the same catalog and restrictions
+        use_last_plan = True  # after a refresh of the catalog the last accepted sets are checked and repaired
+        n_drivers = 4  # browsers visiting product pages in parallel in full mode (each takes up to 1 GB)
+        fetch_backend = "selenium"  # or "http": pages are fetched without rendering, the browsers take the rest
+        incremental_full_mode = False  # if True, full mode fetches only new dishes and a few stale ones, not all
+        write_catalog = True  # the filtered catalog is saved to output for optimizer_api.py
+
         telegram_handler = TelegramHandler(chat_id=user_token, use_telegram=use_telegram, bot=bot)
 
         try:
@@ -143,7 +164,20 @@ def handle_start(message):
                 headless=headless,
                 telegram_handler=telegram_handler,
                 use_mongo=use_mongo,
-                mongo_connector=mongo_connector
+                mongo_connector=mongo_connector,
+                solver_mode=solver_mode,
+                sample_subsets=sample_subsets,
+                sampling=sampling,
+                seed=seed,
+                n_workers=n_workers,
+                n_solutions=n_solutions,
+                time_budget=time_budget,
+                use_solution_cache=use_solution_cache,
+                use_last_plan=use_last_plan,
+                n_drivers=n_drivers,
+                fetch_backend=fetch_backend,
+                incremental_full_mode=incremental_full_mode,
+                write_catalog=write_catalog
             ).run()
 
         except (Exception, KeyboardInterrupt):
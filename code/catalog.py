@@ -0,0 +1,153 @@
+import sys
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from numpy.lib.recfunctions import structured_to_unstructured
+
+
+class Catalog:
+
+    # the filtered catalog of one user: numeric fields of dishes are one NumPy structured array,
+    # and names and links are kept once in tables which rows refer to by integer ids,
+    # so a selection of dishes copies only the array
+
+    DTYPE = np.dtype([
+        ("name_id", np.int32),
+        ("link_id", np.int32),
+        ("price", np.float64),
+        ("calories", np.float64),
+        ("proteins", np.float64),
+        ("fats", np.float64),
+        ("carbo", np.float64),
+        ("quantity", np.int32),
+        ("mass", np.float32),
+    ])
+
+    NUMERIC_COLUMNS = ["price", "calories", "proteins", "fats", "carbo", "quantity", "mass"]
+
+    def __init__(
+        self,
+        record_array: np.ndarray,
+        name_list: list,
+        link_list: list,
+    ):
+
+        self.record_array = record_array
+
+        self.name_list = name_list  # names by ids
+        self.link_list = link_list  # links by ids
+
+    @staticmethod
+    def from_food_df(food_df: pd.DataFrame):
+
+        # equal strings are stored once, and sys.intern makes them shared with the rest of the process
+
+        name_id_vec, name_index = pd.factorize(food_df.index)
+        link_id_vec, link_index = pd.factorize(food_df["link"])
+
+        record_array = np.zeros(food_df.index.size, dtype=Catalog.DTYPE)
+
+        record_array["name_id"] = name_id_vec
+        record_array["link_id"] = link_id_vec
+
+        for column in Catalog.NUMERIC_COLUMNS:
+            record_array[column] = food_df[column].values
+
+        return Catalog(
+            record_array=record_array,
+            name_list=[sys.intern(str(name)) for name in name_index],
+            link_list=[sys.intern(str(link)) for link in link_index],
+        )
+
+    @property
+    def size(self) -> int:
+
+        return self.record_array.size
+
+    def get_matrix(self, column_list: list) -> np.ndarray:
+
+        return structured_to_unstructured(self.record_array[column_list], dtype=np.float64)
+
+    def select(self, is_kept_vec: np.ndarray):
+
+        # a boolean mask or positions of dishes, tables are shared with the selection
+
+        return Catalog(
+            record_array=self.record_array[is_kept_vec],
+            name_list=self.name_list,
+            link_list=self.link_list,
+        )
+
+    def get_names(self) -> list:
+
+        return [self.name_list[name_id] for name_id in self.record_array["name_id"]]
+
+    def get_food_df(self) -> pd.DataFrame:
+
+        # the working frame of the optimizer: numeric columns indexed by names
+
+        return pd.DataFrame(
+            {column: self.record_array[column] for column in self.NUMERIC_COLUMNS},
+            index=pd.Index(self.get_names(), name="name")
+        )
+
+    def get_link_dict(self, name_list: list) -> dict:
+
+        # links of the given dishes by their names
+
+        name_id_dict = {name: name_id for name_id, name in enumerate(self.name_list)}
+
+        link_id_dict = dict(zip(self.record_array["name_id"].tolist(), self.record_array["link_id"].tolist()))
+
+        return {name: self.link_list[link_id_dict[name_id_dict[name]]] for name in name_list}
+
+    def limit_mass(self, max_mass: float):
+
+        # no more portions of a dish than the maximum mass, as in Parser (it does not change a catalog
+        # filtered with the same or smaller max_mass)
+
+        return self.set_quantity(np.minimum(self.record_array["quantity"], max_mass // self.record_array["mass"]))
+
+    def set_quantity(self, quantity_vec: np.ndarray):
+
+        # a copy with the given stock of every dish, dishes out of stock are left out
+
+        record_array = self.record_array.copy()
+
+        record_array["quantity"] = quantity_vec
+
+        return Catalog(
+            record_array=record_array[record_array["quantity"] > 0],
+            name_list=self.name_list,
+            link_list=self.link_list,
+        )
+
+    def write(self, path: Path):
+
+        # CSV or Parquet by the extension (Parquet needs pyarrow or fastparquet)
+
+        food_df = self.get_food_df()
+
+        food_df["link"] = [self.link_list[link_id] for link_id in self.record_array["link_id"]]
+
+        if path.suffix == ".parquet":
+            food_df.to_parquet(path)
+        else:
+            food_df.to_csv(path, encoding="utf-8")
+
+    @staticmethod
+    def read(path: Path):
+
+        if path.suffix == ".parquet":
+            food_df = pd.read_parquet(path)
+        else:
+            food_df = pd.read_csv(path, encoding="utf-8", index_col="name")
+
+        return Catalog.from_food_df(food_df)
+
+    def get_nbytes(self) -> int:
+
+        return self.record_array.nbytes + sum(sys.getsizeof(value) for value in self.name_list + self.link_list)
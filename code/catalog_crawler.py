@@ -0,0 +1,310 @@
+import time
+import asyncio
+
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import requests
+
+from product_page import HttpFetcher, is_hidden_element
+
+
+class CatalogPageParser(HTMLParser):
+
+    # cards of the main column of a catalog page: texts of their first named link, price, rest and cart button
+    # (as Selenium gives them, hidden elements give no text), links of their images to product pages,
+    # and links of the pagination
+
+    FORWARD_TEXT = "Вперёд"
+    PAGINATION_CLASS_LIST = ["pager", "pagination"]  # substrings of classes of the pagination container (any case)
+
+    VOID_TAG_SET = {
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+    }
+
+    SKIPPED_TAG_SET = {"script", "style", "noscript", "template"}
+
+    def __init__(self, page_link: str):
+
+        super().__init__(convert_charrefs=True)
+
+        self.page_link = page_link
+
+        self.raw_card_list = []
+        self.link_list = []  # links of product pages
+        self.page_link_list = []  # links of other pages of the catalog, the forward link first
+
+        self.raw_card = None  # texts of the card which is open now
+        self.is_image_link_taken = False  # whether the image which is open now has given its link
+
+        # open elements as (tag, roles of the element, text list or None, href, whether it is hidden)
+
+        self.element_stack = []
+
+    def handle_starttag(self, tag, attrs):
+
+        if tag in self.VOID_TAG_SET:
+            return
+
+        attr_dict = dict(attrs)
+
+        class_set = set((attr_dict.get("class") or "").split())
+        class_text = attr_dict.get("class") or ""
+
+        open_role_set = {role for element in self.element_stack for role in element[1]}
+
+        role_list = []
+
+        if {"Catalog__col", "Catalog__col--main"} <= class_set:
+            role_list.append("main")
+
+        if ("main" in open_role_set) and ("card" not in open_role_set) and ("ProductCard__content" in class_set):
+
+            role_list.append("card")
+
+            self.raw_card = {"name_list": [], "price_list": [], "rest_list": [], "cart_list": []}
+
+        if any(cls in class_text.lower() for cls in self.PAGINATION_CLASS_LIST):
+            role_list.append("pagination")
+
+        if "ProductCard__image" in class_set:
+
+            role_list.append("image")
+
+            self.is_image_link_taken = False
+
+        if "card" in open_role_set:
+
+            if tag == "a":
+                role_list.append("name_list")
+
+            if "Price__value" in class_set:
+                role_list.append("price_list")
+
+            if "ProductCard__Rest caption" in class_text:
+                role_list.append("rest_list")
+
+            if "CartButton__inner" in class_set:
+                role_list.append("cart_list")
+
+        href = attr_dict.get("href")
+
+        if (tag == "a") and (href is not None):
+
+            # only the first link of an image is taken, as Selenium does
+
+            if ("main" in open_role_set) and ("image" in open_role_set) and not self.is_image_link_taken:
+
+                self.link_list.append(urljoin(self.page_link, href))
+
+                self.is_image_link_taken = True
+
+            # numbered links are taken only from the pagination container, other numbered links of the page
+            # (banners, ratings) are not pages; the forward link is followed wherever it is, as in the browser
+
+            role_list.append("pager" if "pagination" in open_role_set else "forward")
+
+        is_text_needed = any(role.endswith("_list") or (role in ["pager", "forward"]) for role in role_list)
+
+        is_hidden = (bool(self.element_stack) and self.element_stack[-1][4]) or is_hidden_element(attr_dict)
+
+        self.element_stack.append((tag, role_list, [] if is_text_needed else None, href, is_hidden))
+
+    def handle_endtag(self, tag):
+
+        # elements which are not closed in the page end with their parent
+
+        if not any(element[0] == tag for element in self.element_stack):
+            return
+
+        while self.element_stack:
+
+            cur_tag, role_list, text_list, href, _ = self.element_stack.pop()
+
+            self.__close_element(role_list, text_list, href)
+
+            if cur_tag == tag:
+                return
+
+    def __close_element(self, role_list, text_list, href):
+
+        text = "" if text_list is None else "\n".join(text_list)
+
+        for role in role_list:
+
+            if role.endswith("_list") and (self.raw_card is not None):
+                self.raw_card[role].append(text)
+
+            is_page_text = (text == self.FORWARD_TEXT) or ((role == "pager") and text.isdigit())
+
+            if (role in ["pager", "forward"]) and is_page_text:
+
+                page_link = urldefrag(urljoin(self.page_link, href))[0]
+
+                if text == self.FORWARD_TEXT:
+                    self.page_link_list.insert(0, page_link)
+                else:
+                    self.page_link_list.append(page_link)
+
+            if role == "card":
+
+                self.raw_card_list.append({
+                    key: next((cur_text for cur_text in self.raw_card[f"{key}_list"] if cur_text != ""), "")
+                    for key in ["name", "price", "rest", "cart"]
+                })
+
+                self.raw_card = None
+
+    def handle_data(self, data):
+
+        if any(element[0] in self.SKIPPED_TAG_SET for element in self.element_stack):
+            return
+
+        if self.element_stack and self.element_stack[-1][4]:
+            return
+
+        text = " ".join(data.split())
+
+        if text == "":
+            return
+
+        for _, _, text_list, _, _ in self.element_stack:
+            if text_list is not None:
+                text_list.append(text)
+
+    def get_raw_card_list(self) -> list:
+
+        # cards in the shape of product_page.extract_npq_records
+
+        return [
+            {
+                "name": raw_card["name"],
+                "price": raw_card["price"],
+                "rest_text": raw_card["rest"],
+                "cart_text": raw_card["cart"],
+            }
+            for raw_card in self.raw_card_list
+        ]
+
+
+class CatalogCrawler:
+
+    # pages of a catalog section are crawled concurrently: every fetched page gives links to further pages
+    # of the pagination, which are fetched as soon as they are found; requests go over the keep-alive pool
+    # of one HTTP session in threads of asyncio, no more than N_CONNECTIONS at once, and no more often than
+    # MAX_RATE per host; failed requests are retried with exponential backoff
+
+    N_CONNECTIONS = 8
+    MAX_RATE = 4  # requests per second to one host
+    N_RETRIES = 3
+    BACKOFF = 0.5  # seconds before the first retry, it doubles with every next one
+    RETRY_STATUS_SET = {429, 500, 502, 503, 504}
+
+    def __init__(self, fetcher: HttpFetcher):
+
+        self.fetcher = fetcher
+
+        self.next_time_dict = {}  # the earliest time of the next request by hosts
+        self.host_lock = None
+        self.semaphore = None
+
+    def crawl(self, section_link: str) -> Optional[list]:
+
+        # returns parsed pages (CatalogPageParser) in the order they were found,
+        # or None if some page could not be fetched
+
+        return asyncio.run(self.__crawl(section_link))
+
+    async def __crawl(self, section_link: str) -> Optional[list]:
+
+        self.host_lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(self.N_CONNECTIONS)
+
+        page_link_list = [section_link]
+
+        task_set = {asyncio.create_task(self.__crawl_page(section_link))}
+
+        page_dict = {}
+
+        while task_set:
+
+            done_task_set, task_set = await asyncio.wait(task_set, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done_task_set:
+
+                page_link, page = task.result()
+
+                if page is None:
+
+                    for cur_task in task_set:
+                        cur_task.cancel()
+
+                    return None
+
+                page_dict[page_link] = page
+
+                for cur_page_link in page.page_link_list:
+
+                    if cur_page_link not in page_link_list:
+
+                        page_link_list.append(cur_page_link)
+
+                        task_set.add(asyncio.create_task(self.__crawl_page(cur_page_link)))
+
+        return [page_dict[page_link] for page_link in page_link_list]
+
+    async def __crawl_page(self, page_link: str) -> tuple:
+
+        html = await self.__fetch(page_link)
+
+        if html is None:
+            return page_link, None
+
+        page = CatalogPageParser(page_link)
+
+        page.feed(html)
+        page.close()
+
+        return page_link, page
+
+    async def __wait_for_host(self, link: str):
+
+        host = urlparse(link).netloc
+
+        async with self.host_lock:
+
+            cur_time = time.monotonic()
+
+            next_time = max(cur_time, self.next_time_dict.get(host, cur_time))
+
+            self.next_time_dict[host] = next_time + 1 / self.MAX_RATE
+
+        await asyncio.sleep(next_time - cur_time)
+
+    async def __fetch(self, link: str) -> Optional[str]:
+
+        for i_retry in range(self.N_RETRIES + 1):
+
+            if i_retry > 0:
+                await asyncio.sleep(self.BACKOFF * 2 ** (i_retry - 1))
+
+            await self.__wait_for_host(link)
+
+            async with self.semaphore:
+
+                try:
+
+                    response = await asyncio.to_thread(self.fetcher.session.get, link, timeout=HttpFetcher.TIMEOUT)
+
+                except requests.RequestException:
+
+                    continue
+
+            if response.status_code == 200:
+                return response.text
+
+            if response.status_code not in self.RETRY_STATUS_SET:
+                return None
+
+        return None
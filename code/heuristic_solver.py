@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+
+
+class HeuristicSolver:
+
+    # a fast set without the proof of optimality: units are added greedily until the lower bounds are covered,
+    # then the set is improved by the best of all increments, decrements and swaps of units while it gets better,
+    # and the local search is restarted from random kicks of the best set until the time limit;
+    # sets outside the nutrient bands are compared by the price plus a big penalty for the violation
+
+    TIME_LIMIT = 0.3  # seconds
+    MAX_ROUNDS = 200  # kicks of the best set
+    KICK_SIZE = 3  # units removed and added by a kick
+    EPS = 1e-9
+
+    def __init__(
+        self,
+        nutrient_matrix: np.ndarray,
+        price_vec: np.ndarray,
+        quantity_vec: np.ndarray,
+        lower_vec: np.ndarray,
+        upper_vec: np.ndarray,
+        rng: np.random.Generator,
+        time_limit: float = TIME_LIMIT,
+    ):
+
+        self.nutrient_matrix = np.asarray(nutrient_matrix, dtype=np.float64)
+
+        self.price_vec = np.asarray(price_vec, dtype=np.float64)
+        self.quantity_vec = np.asarray(quantity_vec, dtype=np.int64)
+
+        self.lower_vec = np.asarray(lower_vec, dtype=np.float64)
+        self.upper_vec = np.asarray(upper_vec, dtype=np.float64)
+
+        self.rng = rng
+
+        self.time_limit = time_limit
+
+        # violations of bands are measured in their widths, and one width costs more than any set
+
+        self.scale_vec = np.maximum(self.upper_vec - self.lower_vec, 1.)
+        self.penalty = 10 * (self.price_vec @ self.quantity_vec + 1)
+
+        self.n_moves = 0
+        self.n_rounds = 0
+
+    def __get_objective(self, price, sum_matrix):
+
+        # sum_matrix has nutrients of sets in its last axis
+
+        violation = (
+            np.maximum(self.lower_vec - sum_matrix, 0) + np.maximum(sum_matrix - self.upper_vec, 0)
+        ) / self.scale_vec
+
+        return price + self.penalty * violation.sum(axis=-1)
+
+    def __is_feasible(self, sum_vec):
+
+        return bool(np.all(sum_vec >= self.lower_vec - self.EPS) and np.all(sum_vec <= self.upper_vec + self.EPS))
+
+    def __build_greedy(self):
+
+        # units with the biggest decrease of the objective per ruble go first
+
+        quantity_vec = np.zeros_like(self.quantity_vec)
+
+        sum_vec = np.zeros_like(self.lower_vec)
+        price = 0.
+
+        while True:
+
+            objective = self.__get_objective(price, sum_vec)
+
+            new_objective_vec = self.__get_objective(price + self.price_vec, sum_vec + self.nutrient_matrix)
+
+            gain_vec = (objective - new_objective_vec) / np.maximum(self.price_vec, self.EPS)
+            gain_vec[quantity_vec >= self.quantity_vec] = -np.inf
+
+            i_best = int(np.argmax(gain_vec))
+
+            if gain_vec[i_best] <= 0:
+                return quantity_vec
+
+            quantity_vec[i_best] += 1
+
+            sum_vec = sum_vec + self.nutrient_matrix[i_best]
+            price += self.price_vec[i_best]
+
+    def __search_locally(self, quantity_vec):
+
+        # the best move of all increments, decrements and swaps of one unit is made while it decreases the objective
+
+        quantity_vec = quantity_vec.copy()
+
+        sum_vec = self.nutrient_matrix.T @ quantity_vec
+        price = self.price_vec @ quantity_vec
+
+        objective = self.__get_objective(price, sum_vec)
+
+        while True:
+
+            can_add_vec = quantity_vec < self.quantity_vec
+            taken_vec = np.flatnonzero(quantity_vec > 0)
+
+            add_objective_vec = self.__get_objective(price + self.price_vec, sum_vec + self.nutrient_matrix)
+            add_objective_vec[~can_add_vec] = np.inf
+
+            remove_objective_vec = self.__get_objective(
+                price - self.price_vec[taken_vec],
+                sum_vec - self.nutrient_matrix[taken_vec]
+            )
+
+            # rows are removed units and columns are added ones
+
+            swap_objective_matrix = self.__get_objective(
+                price - self.price_vec[taken_vec, None] + self.price_vec[None, :],
+                sum_vec - self.nutrient_matrix[taken_vec, None, :] + self.nutrient_matrix[None, :, :]
+            )
+            swap_objective_matrix[:, ~can_add_vec] = np.inf
+            swap_objective_matrix[np.arange(taken_vec.size), taken_vec] = np.inf
+
+            best_objective = objective
+            best_move = None
+
+            if add_objective_vec.min() < best_objective - self.EPS:
+                best_objective = add_objective_vec.min()
+                best_move = (None, int(np.argmin(add_objective_vec)))
+
+            if (taken_vec.size > 0) and (remove_objective_vec.min() < best_objective - self.EPS):
+                best_objective = remove_objective_vec.min()
+                best_move = (taken_vec[int(np.argmin(remove_objective_vec))], None)
+
+            if (taken_vec.size > 0) and (swap_objective_matrix.min() < best_objective - self.EPS):
+
+                best_objective = swap_objective_matrix.min()
+
+                i_removed, i_added = np.unravel_index(np.argmin(swap_objective_matrix), swap_objective_matrix.shape)
+
+                best_move = (taken_vec[i_removed], int(i_added))
+
+            if best_move is None:
+                return quantity_vec
+
+            self.n_moves += 1
+
+            i_removed, i_added = best_move
+
+            if i_removed is not None:
+
+                quantity_vec[i_removed] -= 1
+
+                sum_vec = sum_vec - self.nutrient_matrix[i_removed]
+                price -= self.price_vec[i_removed]
+
+            if i_added is not None:
+
+                quantity_vec[i_added] += 1
+
+                sum_vec = sum_vec + self.nutrient_matrix[i_added]
+                price += self.price_vec[i_added]
+
+            objective = best_objective
+
+    def __kick(self, quantity_vec):
+
+        quantity_vec = quantity_vec.copy()
+
+        for _ in range(self.KICK_SIZE):
+
+            taken_vec = np.flatnonzero(quantity_vec > 0)
+
+            if taken_vec.size > 0:
+                quantity_vec[self.rng.choice(taken_vec)] -= 1
+
+            free_vec = np.flatnonzero(quantity_vec < self.quantity_vec)
+
+            if free_vec.size > 0:
+                quantity_vec[self.rng.choice(free_vec)] += 1
+
+        return quantity_vec
+
+    def solve(self, max_price, start_quantity_vec=None) -> tuple:
+
+        # returns the cheapest found quantity vector within the bands with price lower than max_price
+        # (zeros and max_price if there is none), start_quantity_vec is an optional set to start from
+        # instead of the greedy one (it must be within quantities, but may be outside of the bands)
+
+        start_time = time.time()
+
+        self.n_moves = 0
+        self.n_rounds = 0
+
+        if start_quantity_vec is None:
+            start_quantity_vec = self.__build_greedy()
+
+        quantity_vec = self.__search_locally(np.asarray(start_quantity_vec, dtype=np.int64))
+
+        min_quantity_vec = None
+        min_price = max_price
+
+        cur_quantity_vec = quantity_vec
+
+        while True:
+
+            price = self.price_vec @ quantity_vec
+
+            if self.__is_feasible(self.nutrient_matrix.T @ quantity_vec) and (price < min_price):
+
+                min_quantity_vec = quantity_vec
+                min_price = price
+
+                cur_quantity_vec = quantity_vec
+
+            if (self.n_rounds >= self.MAX_ROUNDS) or (time.time() - start_time > self.time_limit):
+                break
+
+            self.n_rounds += 1
+
+            # the kicks start from the best feasible set, or from the last one while there is none
+
+            if min_quantity_vec is None:
+                cur_quantity_vec = quantity_vec
+
+            quantity_vec = self.__search_locally(self.__kick(cur_quantity_vec))
+
+        if min_quantity_vec is None:
+            return np.zeros_like(self.quantity_vec), max_price
+
+        return min_quantity_vec, min_price
@@ -0,0 +1,655 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+
+class IntegerSolver:
+
+    # minimizes price_vec @ x subject to lower_vec <= nutrient_matrix.T @ x <= upper_vec
+    # and 0 <= x <= quantity_vec, x integer: LP relaxation (bounded simplex) + branch and bound;
+    # columns of nutrient_matrix are any linear rows, lower bounds of rows may be -inf
+
+    MAX_SIMPLEX_ITERATIONS = 5000
+    MAX_NODES = 20000
+    EPS = 1e-9
+    INTEGER_EPS = 1e-6
+
+    def __init__(
+        self,
+        nutrient_matrix: np.ndarray,
+        price_vec: np.ndarray,
+        quantity_vec: np.ndarray,
+        lower_vec: np.ndarray,
+        upper_vec: np.ndarray,
+        max_nodes: int = MAX_NODES,
+        n_solutions: int = 1,
+        deadline: float = None,
+        progress_callback=None,
+    ):
+
+        self.n_dishes, self.n_rows = nutrient_matrix.shape
+
+        self.price_vec = price_vec.astype(np.float64)
+        self.quantity_vec = quantity_vec.astype(np.float64)
+
+        self.lower_vec = lower_vec.astype(np.float64)
+        self.upper_vec = upper_vec.astype(np.float64)
+
+        # columns are dishes, slack variables (row values) and artificial variables of the first phase
+
+        self.matrix = np.hstack([
+            nutrient_matrix.T.astype(np.float64),
+            -np.eye(self.n_rows),
+            np.eye(self.n_rows),
+        ])
+
+        self.cost_vec = np.zeros(self.matrix.shape[1])
+        self.cost_vec[:self.n_dishes] = self.price_vec
+
+        self.are_prices_integer = bool(np.all(self.price_vec == np.round(self.price_vec)))
+
+        self.max_nodes = max_nodes
+        self.n_solutions = n_solutions
+
+        self.max_price = None
+
+        self.solution_heap = []
+        self.solution_key_set = set()
+        self.solution_list = []
+
+        # the search stops at the deadline (time.time()) with the best solutions found by then,
+        # progress_callback gets the cheapest price (None if there is no solution yet) and explored nodes
+
+        self.deadline = deadline
+        self.progress_callback = progress_callback
+
+        self.n_nodes = 0
+        self.is_optimal = False
+
+    def solve_relaxation(
+        self,
+        dish_lower_vec: np.ndarray,
+        dish_upper_vec: np.ndarray,
+    ):
+
+        state = self.__solve_from_scratch(
+            np.concatenate([dish_lower_vec, self.lower_vec]),
+            np.concatenate([dish_upper_vec, self.upper_vec])
+        )
+
+        if state is None:
+            return None, None
+
+        dish_vec = np.clip(state[0][:self.n_dishes], dish_lower_vec, dish_upper_vec)
+
+        return dish_vec, float(self.price_vec @ dish_vec)
+
+    def __get_bound_vecs(self, structural_lower_vec, structural_upper_vec):
+
+        lower_bound_vec = np.concatenate([structural_lower_vec, np.zeros(self.n_rows)])
+        upper_bound_vec = np.concatenate([structural_upper_vec, np.full(self.n_rows, np.inf)])
+
+        return lower_bound_vec, upper_bound_vec
+
+    def __solve_from_scratch(self, structural_lower_vec, structural_upper_vec):
+
+        n_vars = self.matrix.shape[1]
+
+        n_structural = self.n_dishes + self.n_rows
+
+        lower_bound_vec, upper_bound_vec = self.__get_bound_vecs(structural_lower_vec, structural_upper_vec)
+
+        row_lower_vec = lower_bound_vec[self.n_dishes:n_structural]
+        row_upper_vec = upper_bound_vec[self.n_dishes:n_structural]
+
+        value_vec = lower_bound_vec.copy()
+        value_vec[n_structural:] = 0
+
+        # nonbasic variables must sit exactly at one of their bounds: slack variables of rows within their bounds
+        # start in the basis, the others start at the upper bound of their row if the row exceeds it
+        # and at the lower one otherwise, and artificial variables take the rest
+
+        row_vec = self.matrix[:, :self.n_dishes] @ value_vec[:self.n_dishes]
+
+        is_inside_vec = (row_vec >= row_lower_vec) & (row_vec <= row_upper_vec)
+
+        is_upper_vec = np.zeros(n_vars, dtype=bool)
+        is_upper_vec[self.n_dishes:n_structural] = row_vec > row_upper_vec
+
+        value_vec[self.n_dishes:n_structural] = np.where(
+            is_inside_vec,
+            row_vec,
+            np.where(is_upper_vec[self.n_dishes:n_structural], row_upper_vec, row_lower_vec)
+        )
+
+        residual_vec = row_vec - value_vec[self.n_dishes:n_structural]
+
+        sign_vec = np.where(residual_vec > 0, -1., 1.)
+
+        matrix = self.matrix.copy()
+        matrix[:, n_structural:] *= sign_vec
+
+        value_vec[n_structural:] = np.abs(residual_vec)
+
+        # artificial variables of rows within their bounds are not needed at all
+
+        upper_bound_vec[n_structural:][is_inside_vec] = 0
+
+        row_number_vec = np.arange(self.n_rows)
+
+        basis_vec = np.where(is_inside_vec, self.n_dishes + row_number_vec, n_structural + row_number_vec)
+        basis_inv = np.diag(np.where(is_inside_vec, -1., sign_vec))
+
+        is_basic_vec = np.zeros(n_vars, dtype=bool)
+        is_basic_vec[basis_vec] = True
+
+        first_phase_cost_vec = np.zeros(n_vars)
+        first_phase_cost_vec[n_structural:] = 1
+
+        basis_inv = self.__run_simplex(
+            matrix,
+            first_phase_cost_vec,
+            lower_bound_vec,
+            upper_bound_vec,
+            value_vec,
+            basis_vec,
+            basis_inv,
+            is_basic_vec,
+            is_upper_vec
+        )
+
+        if basis_inv is None or value_vec[n_structural:].sum() > self.INTEGER_EPS:
+            return None
+
+        # artificial variables are fixed at zero for the second phase
+
+        upper_bound_vec[n_structural:] = 0
+
+        basis_inv = self.__run_simplex(
+            matrix,
+            self.cost_vec,
+            lower_bound_vec,
+            upper_bound_vec,
+            value_vec,
+            basis_vec,
+            basis_inv,
+            is_basic_vec,
+            is_upper_vec
+        )
+
+        if basis_inv is None:
+            return None
+
+        return value_vec, basis_vec, is_basic_vec, is_upper_vec
+
+    def __solve_from_parent(self, structural_lower_vec, structural_upper_vec, parent_state, parent_basis_inv):
+
+        # a child differs from its parent in one bound, so the optimal basis of the parent stays dual feasible
+        # and the dual simplex restores primal feasibility in a few pivots
+
+        _, basis_vec, is_basic_vec, is_upper_vec = parent_state
+
+        matrix = self.matrix
+
+        n_structural = self.n_dishes + self.n_rows
+
+        lower_bound_vec, upper_bound_vec = self.__get_bound_vecs(structural_lower_vec, structural_upper_vec)
+        upper_bound_vec[n_structural:] = 0
+
+        basis_vec = basis_vec.copy()
+        basis_inv = parent_basis_inv.copy()
+        is_basic_vec = is_basic_vec.copy()
+        is_upper_vec = is_upper_vec.copy()
+
+        value_vec = np.where(is_upper_vec, upper_bound_vec, lower_bound_vec)
+
+        if not np.isfinite(value_vec[~is_basic_vec]).all():
+            return self.__solve_from_scratch(structural_lower_vec, structural_upper_vec)
+
+        basis_inv = self.__run_dual_simplex(
+            matrix,
+            lower_bound_vec,
+            upper_bound_vec,
+            value_vec,
+            basis_vec,
+            basis_inv,
+            is_basic_vec,
+            is_upper_vec
+        )
+
+        if basis_inv is None:
+            return None
+
+        if basis_inv is False:
+            return self.__solve_from_scratch(structural_lower_vec, structural_upper_vec)
+
+        basis_inv = self.__run_simplex(
+            matrix,
+            self.cost_vec,
+            lower_bound_vec,
+            upper_bound_vec,
+            value_vec,
+            basis_vec,
+            basis_inv,
+            is_basic_vec,
+            is_upper_vec
+        )
+
+        if basis_inv is None:
+            return self.__solve_from_scratch(structural_lower_vec, structural_upper_vec)
+
+        return value_vec, basis_vec, is_basic_vec, is_upper_vec
+
+    def __run_dual_simplex(
+        self,
+        matrix,
+        lower_bound_vec,
+        upper_bound_vec,
+        value_vec,
+        basis_vec,
+        basis_inv,
+        is_basic_vec,
+        is_upper_vec,
+    ):
+
+        # bounded dual simplex: returns the basis inverse, None if the problem is infeasible and False
+        # if it gives up (too many iterations or an inaccurate inverse), values, basis and flags are updated in place
+
+        for _ in range(self.MAX_SIMPLEX_ITERATIONS):
+
+            value_vec[basis_vec] = 0
+            value_vec[basis_vec] = -basis_inv @ (matrix @ value_vec)
+
+            basic_value_vec = value_vec[basis_vec]
+
+            below_vec = lower_bound_vec[basis_vec] - basic_value_vec
+            above_vec = basic_value_vec - upper_bound_vec[basis_vec]
+
+            infeasibility_vec = np.maximum(below_vec, above_vec)
+
+            i_leaving = int(np.argmax(infeasibility_vec))
+
+            if infeasibility_vec[i_leaving] <= self.INTEGER_EPS:
+                return basis_inv
+
+            is_below = below_vec[i_leaving] > 0
+
+            dual_vec = self.cost_vec[basis_vec] @ basis_inv
+            reduced_cost_vec = self.cost_vec - dual_vec @ matrix
+
+            alpha_row_vec = basis_inv[i_leaving] @ matrix
+
+            # the leaving variable moves towards its violated bound by -alpha * (change of the entering variable)
+
+            is_movable_vec = ~is_basic_vec & (upper_bound_vec - lower_bound_vec > self.EPS)
+
+            if is_below:
+                is_candidate_vec = is_movable_vec & (
+                    (~is_upper_vec & (alpha_row_vec < -self.EPS)) |
+                    (is_upper_vec & (alpha_row_vec > self.EPS))
+                )
+            else:
+                is_candidate_vec = is_movable_vec & (
+                    (~is_upper_vec & (alpha_row_vec > self.EPS)) |
+                    (is_upper_vec & (alpha_row_vec < -self.EPS))
+                )
+
+            if not is_candidate_vec.any():
+                return None
+
+            candidate_vec = np.flatnonzero(is_candidate_vec)
+
+            ratio_vec = np.abs(reduced_cost_vec[candidate_vec]) / np.abs(alpha_row_vec[candidate_vec])
+
+            i_entering = candidate_vec[np.argmin(ratio_vec)]
+
+            alpha_vec = basis_inv @ matrix[:, i_entering]
+
+            if abs(alpha_vec[i_leaving]) <= self.EPS:
+                return False
+
+            leaving_var = basis_vec[i_leaving]
+
+            is_upper_vec[leaving_var] = not is_below
+
+            value_vec[leaving_var] = (
+                lower_bound_vec[leaving_var] if is_below else upper_bound_vec[leaving_var]
+            )
+
+            is_basic_vec[leaving_var] = False
+            is_basic_vec[i_entering] = True
+            is_upper_vec[i_entering] = False
+
+            basis_vec[i_leaving] = i_entering
+
+            pivot_row_vec = basis_inv[i_leaving] / alpha_vec[i_leaving]
+
+            basis_inv -= np.outer(alpha_vec, pivot_row_vec)
+            basis_inv[i_leaving] = pivot_row_vec
+
+        return False
+
+    def __run_simplex(
+        self,
+        matrix,
+        cost_vec,
+        lower_bound_vec,
+        upper_bound_vec,
+        value_vec,
+        basis_vec,
+        basis_inv,
+        is_basic_vec,
+        is_upper_vec,
+    ):
+
+        # bounded primal simplex: nonbasic variables stay at one of their bounds,
+        # values, basis and flags are updated in place
+
+        n_degenerate = 0
+
+        for _ in range(self.MAX_SIMPLEX_ITERATIONS):
+
+            dual_vec = cost_vec[basis_vec] @ basis_inv
+            reduced_cost_vec = cost_vec - dual_vec @ matrix
+
+            is_movable_vec = ~is_basic_vec & (upper_bound_vec - lower_bound_vec > self.EPS)
+
+            is_candidate_vec = is_movable_vec & (
+                (~is_upper_vec & (reduced_cost_vec < -self.EPS)) |
+                (is_upper_vec & (reduced_cost_vec > self.EPS))
+            )
+
+            if not is_candidate_vec.any():
+                return basis_inv
+
+            candidate_vec = np.flatnonzero(is_candidate_vec)
+
+            # Dantzig rule, but Bland rule after many degenerate steps to avoid cycling
+
+            if n_degenerate < 50:
+                i_entering = candidate_vec[np.argmax(np.abs(reduced_cost_vec[candidate_vec]))]
+            else:
+                i_entering = candidate_vec[0]
+
+            direction = -1. if is_upper_vec[i_entering] else 1.
+
+            alpha_vec = basis_inv @ matrix[:, i_entering]
+            rate_vec = -direction * alpha_vec
+
+            basic_value_vec = value_vec[basis_vec]
+
+            step_vec = np.full(basis_vec.size, np.inf)
+
+            is_decreasing_vec = rate_vec < -self.EPS
+            is_increasing_vec = rate_vec > self.EPS
+
+            step_vec[is_decreasing_vec] = (
+                basic_value_vec[is_decreasing_vec] - lower_bound_vec[basis_vec][is_decreasing_vec]
+            ) / -rate_vec[is_decreasing_vec]
+
+            step_vec[is_increasing_vec] = (
+                upper_bound_vec[basis_vec][is_increasing_vec] - basic_value_vec[is_increasing_vec]
+            ) / rate_vec[is_increasing_vec]
+
+            step_vec = np.maximum(step_vec, 0)
+
+            i_leaving = int(np.argmin(step_vec))
+            step = step_vec[i_leaving]
+
+            flip_step = upper_bound_vec[i_entering] - lower_bound_vec[i_entering]
+
+            if min(step, flip_step) == np.inf:
+                return None
+
+            n_degenerate = n_degenerate + 1 if min(step, flip_step) <= self.EPS else 0
+
+            if flip_step <= step:
+
+                value_vec[basis_vec] += rate_vec * flip_step
+                value_vec[i_entering] = upper_bound_vec[i_entering] if direction > 0 else lower_bound_vec[i_entering]
+
+                is_upper_vec[i_entering] = direction > 0
+
+                continue
+
+            value_vec[basis_vec] += rate_vec * step
+            value_vec[i_entering] += direction * step
+
+            leaving_var = basis_vec[i_leaving]
+
+            is_upper_vec[leaving_var] = rate_vec[i_leaving] > 0
+
+            value_vec[leaving_var] = (
+                upper_bound_vec[leaving_var] if is_upper_vec[leaving_var] else lower_bound_vec[leaving_var]
+            )
+
+            is_basic_vec[leaving_var] = False
+            is_basic_vec[i_entering] = True
+            is_upper_vec[i_entering] = False
+
+            basis_vec[i_leaving] = i_entering
+
+            pivot_row_vec = basis_inv[i_leaving] / alpha_vec[i_leaving]
+
+            basis_inv -= np.outer(alpha_vec, pivot_row_vec)
+            basis_inv[i_leaving] = pivot_row_vec
+
+        return None
+
+    def __get_price(self, state):
+
+        return float(self.price_vec @ state[0][:self.n_dishes])
+
+    def __is_pruned(self, bound, min_price):
+
+        if self.are_prices_integer:
+            return np.ceil(bound - self.INTEGER_EPS) >= min_price
+
+        return bound >= min_price - self.INTEGER_EPS
+
+    def __is_feasible(self, dish_vec):
+
+        row_vec = self.matrix[:, :self.n_dishes] @ dish_vec
+
+        return bool(
+            np.all(row_vec >= self.lower_vec - self.INTEGER_EPS) and
+            np.all(row_vec <= self.upper_vec + self.INTEGER_EPS)
+        )
+
+    def __get_max_price(self):
+
+        # a new solution is kept only if it is cheaper than the most expensive of n_solutions kept ones
+
+        if len(self.solution_heap) < self.n_solutions:
+            return self.max_price
+
+        return -self.solution_heap[0][0]
+
+    def __add_solution(self, dish_vec):
+
+        price = float(self.price_vec @ dish_vec)
+
+        if (price >= self.__get_max_price()) or not self.__is_feasible(dish_vec):
+            return
+
+        key = tuple(dish_vec.astype(int).tolist())
+
+        if key in self.solution_key_set:
+            return
+
+        self.solution_key_set.add(key)
+
+        heapq.heappush(self.solution_heap, (-price, key))
+
+        if len(self.solution_heap) > self.n_solutions:
+            heapq.heappop(self.solution_heap)
+
+    def __push_children(self, node_heap, push_counter, state, child_bound_vec_list):
+
+        # nodes keep only their bases, the inverse is computed once for all children
+
+        try:
+            basis_inv = np.linalg.inv(self.matrix[:, state[1]])
+        except np.linalg.LinAlgError:
+            basis_inv = None
+
+        for child_lower_vec, child_upper_vec in child_bound_vec_list:
+
+            if basis_inv is None:
+                child_state = self.__solve_from_scratch(child_lower_vec, child_upper_vec)
+            else:
+                child_state = self.__solve_from_parent(child_lower_vec, child_upper_vec, state, basis_inv)
+
+            if child_state is None:
+                continue
+
+            child_bound = self.__get_price(child_state)
+
+            if self.__is_pruned(child_bound, self.__get_max_price()):
+                continue
+
+            heapq.heappush(
+                node_heap,
+                (child_bound, -next(push_counter), child_lower_vec, child_upper_vec, child_state)
+            )
+
+    def solve(self, max_price, start_dish_vec=None) -> tuple:
+
+        # returns the cheapest integer quantity vector with price lower than max_price
+        # (zeros and max_price if there is none), start_dish_vec is an optional known feasible vector;
+        # n_solutions cheapest distinct vectors are left in solution_list as (vector, price), the cheapest first
+
+        self.max_price = max_price
+
+        self.solution_heap = []  # the most expensive kept solution is on the top
+        self.solution_key_set = set()
+
+        if start_dish_vec is not None:
+            self.__add_solution(np.asarray(start_dish_vec, dtype=np.float64))
+
+        self.n_nodes = 0
+        self.is_optimal = True
+
+        # bounds of a node are given for dishes and for row values
+
+        root_lower_vec = np.concatenate([np.zeros(self.n_dishes), self.lower_vec])
+        root_upper_vec = np.concatenate([self.quantity_vec, self.upper_vec])
+
+        state = self.__solve_from_scratch(root_lower_vec, root_upper_vec)
+
+        # best-first search over the nodes, a counter breaks ties in favour of the latest (deepest) node
+
+        push_counter = itertools.count()
+
+        node_heap = [] if state is None else [(self.__get_price(state), 0, root_lower_vec, root_upper_vec, state)]
+
+        while node_heap:
+
+            bound, _, cur_lower_vec, cur_upper_vec, state = heapq.heappop(node_heap)
+
+            if self.__is_pruned(bound, self.__get_max_price()):
+                continue
+
+            if self.n_nodes >= self.max_nodes:
+
+                self.is_optimal = False
+
+                break
+
+            if (self.deadline is not None) and (time.time() > self.deadline):
+
+                self.is_optimal = False
+
+                break
+
+            self.n_nodes += 1
+
+            if self.progress_callback is not None:
+                self.progress_callback(-max(self.solution_heap)[0] if self.solution_heap else None, self.n_nodes)
+
+            dish_vec = state[0][:self.n_dishes]
+
+            fraction_vec = np.abs(dish_vec - np.round(dish_vec))
+
+            if fraction_vec.max() <= self.INTEGER_EPS:
+
+                rounded_vec = np.round(dish_vec)
+
+                self.__add_solution(rounded_vec)
+
+                # other solutions of the subtree differ from this one in some dish: the first free dish
+                # is fixed at its value in one child (with the same relaxation) and excluded in the others
+
+                free_vec = np.flatnonzero(cur_lower_vec[:self.n_dishes] < cur_upper_vec[:self.n_dishes])
+
+                if (self.n_solutions == 1) or (free_vec.size == 0):
+                    continue
+
+                i_split = free_vec[0]
+
+                split_value = rounded_vec[i_split]
+
+                fixed_lower_vec = cur_lower_vec.copy()
+                fixed_lower_vec[i_split] = split_value
+
+                fixed_upper_vec = cur_upper_vec.copy()
+                fixed_upper_vec[i_split] = split_value
+
+                heapq.heappush(node_heap, (bound, -next(push_counter), fixed_lower_vec, fixed_upper_vec, state))
+
+                child_bound_vec_list = []
+
+                if split_value - 1 >= cur_lower_vec[i_split]:
+
+                    down_upper_vec = cur_upper_vec.copy()
+                    down_upper_vec[i_split] = split_value - 1
+
+                    child_bound_vec_list.append((cur_lower_vec, down_upper_vec))
+
+                if split_value + 1 <= cur_upper_vec[i_split]:
+
+                    up_lower_vec = cur_lower_vec.copy()
+                    up_lower_vec[i_split] = split_value + 1
+
+                    child_bound_vec_list.append((up_lower_vec, cur_upper_vec))
+
+                self.__push_children(node_heap, push_counter, state, child_bound_vec_list)
+
+                continue
+
+            # rounding the relaxation often gives a good incumbent early
+
+            for rounded_vec in (np.floor(dish_vec + self.INTEGER_EPS), np.ceil(dish_vec - self.INTEGER_EPS)):
+                self.__add_solution(rounded_vec)
+
+            if self.__is_pruned(bound, self.__get_max_price()):
+                continue
+
+            i_branch = int(np.argmax(fraction_vec))
+
+            branch_value = dish_vec[i_branch]
+
+            down_upper_vec = cur_upper_vec.copy()
+            down_upper_vec[i_branch] = np.floor(branch_value)
+
+            up_lower_vec = cur_lower_vec.copy()
+            up_lower_vec[i_branch] = np.ceil(branch_value)
+
+            self.__push_children(
+                node_heap,
+                push_counter,
+                state,
+                [(cur_lower_vec, down_upper_vec), (up_lower_vec, cur_upper_vec)]
+            )
+
+        self.solution_list = [
+            (np.array(key, dtype=int), -negative_price)
+            for negative_price, key in sorted(self.solution_heap, reverse=True)
+        ]
+
+        if not self.solution_list:
+            return np.zeros(self.n_dishes, dtype=int), max_price
+
+        return self.solution_list[0]
@@ -0,0 +1,187 @@
+import time
+
+import numpy as np
+
+
+class IterativeSolver:
+
+    # the same depth-first search as Optimizer.__optimize (the same nodes in the same order),
+    # but with an explicit preallocated stack instead of one recursive call per unit of every dish
+
+    CHECK_INTERVAL = 1 << 16  # nodes between checks of the deadline and progress reports
+
+    def __init__(
+        self,
+        nutrient_matrix: np.ndarray,
+        price_vec: np.ndarray,
+        quantity_vec: np.ndarray,
+        lower_vec: np.ndarray,
+        upper_vec: np.ndarray,
+        deadline: float = None,
+        progress_callback=None,
+    ):
+
+        # calories, proteins, fats and carbohydrates of every dish are rows of one contiguous array
+
+        self.nutrient_matrix = np.ascontiguousarray(nutrient_matrix, dtype=np.float64)
+
+        self.price_vec = np.ascontiguousarray(price_vec, dtype=np.float64)
+        self.quantity_vec = np.ascontiguousarray(quantity_vec, dtype=np.int64)
+
+        self.lower_vec = np.asarray(lower_vec, dtype=np.float64)
+        self.upper_vec = np.asarray(upper_vec, dtype=np.float64)
+
+        # the search stops at the deadline (time.time()) with the best set found by then,
+        # progress_callback gets the price of this set (None if there is no set yet) and explored nodes
+
+        self.deadline = deadline
+        self.progress_callback = progress_callback
+
+        self.n_nodes = 0
+        self.is_optimal = False
+
+    def solve(self, max_price) -> tuple:
+
+        n_dishes = self.price_vec.size
+
+        # reading python lists is several times cheaper than reading numpy scalars in this loop
+
+        nutrient_list = self.nutrient_matrix.tolist()
+        price_list = self.price_vec.tolist()
+        quantity_list = self.quantity_vec.tolist()
+
+        # every unit taken is one level of the stack: the dish and the state before taking it
+
+        max_depth = int(self.quantity_vec.sum()) + 1
+
+        dish_stack = [0] * max_depth
+        state_stack = [None] * max_depth
+
+        taken_list = [0] * n_dishes
+
+        calories_lower, proteins_lower, fats_lower, carbo_lower = self.lower_vec.tolist()
+        calories_upper, proteins_upper, fats_upper, carbo_upper = self.upper_vec.tolist()
+
+        cur_price = 0
+
+        min_quantity_list = None
+        min_price = max_price
+
+        i_dish = 0
+        depth = 0
+
+        n_nodes = 0
+
+        is_checked = (self.deadline is not None) or (self.progress_callback is not None)
+
+        next_check_nodes = self.CHECK_INTERVAL if is_checked else -1
+
+        self.is_optimal = True
+
+        while True:
+
+            n_nodes += 1
+
+            if n_nodes == next_check_nodes:
+
+                next_check_nodes += self.CHECK_INTERVAL
+
+                if self.progress_callback is not None:
+                    self.progress_callback(None if min_quantity_list is None else min_price, n_nodes)
+
+                if (self.deadline is not None) and (time.time() > self.deadline):
+
+                    self.is_optimal = False
+
+                    break
+
+            if (calories_lower <= 0) and \
+               (proteins_lower <= 0) and \
+               (fats_lower <= 0) and \
+               (carbo_lower <= 0):
+
+                min_quantity_list = taken_list.copy()
+                min_price = cur_price
+
+            elif i_dish < n_dishes:
+
+                cur_calories, cur_proteins, cur_fats, cur_carbo = nutrient_list[i_dish]
+
+                new_cur_price = cur_price + price_list[i_dish]
+
+                if (cur_calories <= calories_upper) and \
+                   (cur_proteins <= proteins_upper) and \
+                   (cur_fats <= fats_upper) and \
+                   (cur_carbo <= carbo_upper) and \
+                   (new_cur_price < min_price):
+
+                    dish_stack[depth] = i_dish
+                    state_stack[depth] = (
+                        calories_lower,
+                        calories_upper,
+                        proteins_lower,
+                        proteins_upper,
+                        fats_lower,
+                        fats_upper,
+                        carbo_lower,
+                        carbo_upper,
+                        cur_price,
+                    )
+
+                    depth += 1
+
+                    calories_lower -= cur_calories
+                    calories_upper -= cur_calories
+                    proteins_lower -= cur_proteins
+                    proteins_upper -= cur_proteins
+                    fats_lower -= cur_fats
+                    fats_upper -= cur_fats
+                    carbo_lower -= cur_carbo
+                    carbo_upper -= cur_carbo
+
+                    cur_price = new_cur_price
+
+                    taken_list[i_dish] += 1
+
+                    if taken_list[i_dish] == quantity_list[i_dish]:
+                        i_dish += 1
+
+                    continue
+
+                # the branch without one more unit of the current dish
+
+                i_dish += 1
+
+                continue
+
+            # the branch is finished: return one unit and try the branch without it
+
+            if depth == 0:
+                break
+
+            depth -= 1
+
+            i_dish = dish_stack[depth]
+
+            (
+                calories_lower,
+                calories_upper,
+                proteins_lower,
+                proteins_upper,
+                fats_lower,
+                fats_upper,
+                carbo_lower,
+                carbo_upper,
+                cur_price,
+            ) = state_stack[depth]
+
+            taken_list[i_dish] -= 1
+
+            i_dish += 1
+
+        self.n_nodes = n_nodes
+
+        if min_quantity_list is None:
+            return np.zeros(n_dishes, dtype=self.quantity_vec.dtype), min_price
+
+        return np.array(min_quantity_list, dtype=self.quantity_vec.dtype), min_price
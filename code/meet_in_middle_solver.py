@@ -0,0 +1,175 @@
+import numpy as np
+
+
+class MeetInMiddleSolver:
+
+    # dishes are split into two halves, all quantity vectors of each half within upper bounds and price
+    # are enumerated at once, and the cheapest pair of vectors of both halves within the nutrient bands is found;
+    # it gives the same price as the depth-first search, but its memory grows as the product of quantity + 1
+
+    MAX_VECTORS = 1 << 20  # quantity vectors of one half before pruning, about 50 MB of arrays
+    CHUNK_SIZE = 16  # vectors of the first half joined with the second one at once
+    MAX_CHUNK_CELLS = 1 << 18  # pairs of vectors compared at once, it bounds the memory of the join
+
+    def __init__(
+        self,
+        nutrient_matrix: np.ndarray,
+        price_vec: np.ndarray,
+        quantity_vec: np.ndarray,
+        lower_vec: np.ndarray,
+        upper_vec: np.ndarray,
+    ):
+
+        # every row of value matrices is price, calories, proteins, fats and carbohydrates
+
+        self.value_matrix = np.column_stack([price_vec, nutrient_matrix]).astype(np.float64)
+
+        self.quantity_vec = np.asarray(quantity_vec, dtype=np.int64)
+
+        self.lower_vec = np.asarray(lower_vec, dtype=np.float64)
+        self.upper_vec = np.asarray(upper_vec, dtype=np.float64)
+
+        self.n_vectors = 0  # vectors of both halves after pruning
+
+    @staticmethod
+    def split_dishes(quantity_vec: np.ndarray) -> tuple:
+
+        # dishes with more units go first to the half with the smaller product of quantity + 1
+
+        log_size_vec = np.log(np.asarray(quantity_vec, dtype=np.float64) + 1)
+
+        half_list = [[], []]
+        log_size_list = [0., 0.]
+
+        for i_dish in np.argsort(-log_size_vec, kind="stable"):
+
+            i_half = int(log_size_list[1] < log_size_list[0])
+
+            half_list[i_half].append(i_dish)
+            log_size_list[i_half] += log_size_vec[i_dish]
+
+        return np.sort(half_list[0]).astype(int), np.sort(half_list[1]).astype(int)
+
+    @staticmethod
+    def fits(quantity_vec: np.ndarray, max_vectors: int = MAX_VECTORS) -> bool:
+
+        return all(
+            np.prod(np.asarray(quantity_vec)[half_vec] + 1, dtype=np.float64) <= max_vectors
+            for half_vec in MeetInMiddleSolver.split_dishes(quantity_vec)
+        )
+
+    def __enumerate_half(self, half_vec: np.ndarray, max_price) -> tuple:
+
+        # units of every dish are added to all vectors found before, vectors over upper bounds or price are dropped
+
+        value_matrix = np.zeros((1, self.value_matrix.shape[1]))
+        unit_matrix = np.zeros((1, half_vec.size), dtype=np.min_scalar_type(int(self.quantity_vec.max(initial=0))))
+
+        for i_column, i_dish in enumerate(half_vec):
+
+            value_matrix_list = [value_matrix]
+            unit_matrix_list = [unit_matrix]
+
+            for n_units in range(1, self.quantity_vec[i_dish] + 1):
+
+                new_value_matrix = value_matrix + n_units * self.value_matrix[i_dish]
+
+                is_kept_vec = (new_value_matrix[:, 1:] <= self.upper_vec).all(axis=1) & \
+                              (new_value_matrix[:, 0] < max_price)
+
+                if not is_kept_vec.any():
+                    break
+
+                new_unit_matrix = unit_matrix[is_kept_vec]
+                new_unit_matrix[:, i_column] = n_units
+
+                value_matrix_list.append(new_value_matrix[is_kept_vec])
+                unit_matrix_list.append(new_unit_matrix)
+
+            value_matrix = np.concatenate(value_matrix_list)
+            unit_matrix = np.concatenate(unit_matrix_list)
+
+        return value_matrix, unit_matrix
+
+    def solve(self, max_price) -> tuple:
+
+        n_dishes = self.quantity_vec.size
+
+        first_half_vec, second_half_vec = self.split_dishes(self.quantity_vec)
+
+        first_value_matrix, first_unit_matrix = self.__enumerate_half(first_half_vec, max_price)
+        second_value_matrix, second_unit_matrix = self.__enumerate_half(second_half_vec, max_price)
+
+        self.n_vectors = first_value_matrix.shape[0] + second_value_matrix.shape[0]
+
+        # both halves are sorted by calories: calories of the second half suitable for a vector of the first one
+        # are a contiguous range, and neighbouring vectors of the first half have close ranges
+
+        first_order_vec = np.argsort(first_value_matrix[:, 1], kind="stable")
+        second_order_vec = np.argsort(second_value_matrix[:, 1], kind="stable")
+
+        first_value_matrix = first_value_matrix[first_order_vec]
+        second_value_matrix = second_value_matrix[second_order_vec]
+
+        start_vec = np.searchsorted(
+            second_value_matrix[:, 1],
+            self.lower_vec[0] - first_value_matrix[:, 1],
+            side="left"
+        )
+        end_vec = np.searchsorted(
+            second_value_matrix[:, 1],
+            self.upper_vec[0] - first_value_matrix[:, 1],
+            side="right"
+        )
+
+        min_price = max_price
+        min_pair = None
+
+        for i_start in range(0, first_value_matrix.shape[0], self.CHUNK_SIZE):
+
+            chunk_value_matrix = first_value_matrix[i_start:i_start + self.CHUNK_SIZE]
+
+            range_start = start_vec[i_start:i_start + self.CHUNK_SIZE].min()
+            range_end = end_vec[i_start:i_start + self.CHUNK_SIZE].max()
+
+            range_step = max(1, self.MAX_CHUNK_CELLS // chunk_value_matrix.shape[0])
+
+            for j_start in range(range_start, range_end, range_step):
+
+                j_end = min(j_start + range_step, range_end)
+
+                # only vectors of the second half which can give a cheaper set are compared
+
+                j_vec = np.arange(j_start, j_end)
+                j_vec = j_vec[second_value_matrix[j_vec, 0] < min_price - chunk_value_matrix[:, 0].min()]
+
+                if j_vec.size == 0:
+                    continue
+
+                sum_tensor = chunk_value_matrix[:, None, :] + second_value_matrix[j_vec][None, :, :]
+
+                is_feasible_matrix = (sum_tensor[:, :, 1:] >= self.lower_vec).all(axis=2) & \
+                                     (sum_tensor[:, :, 1:] <= self.upper_vec).all(axis=2) & \
+                                     (sum_tensor[:, :, 0] < min_price)
+
+                if not is_feasible_matrix.any():
+                    continue
+
+                price_matrix = np.where(is_feasible_matrix, sum_tensor[:, :, 0], np.inf)
+
+                i_first, i_second = np.unravel_index(np.argmin(price_matrix), price_matrix.shape)
+
+                min_price = price_matrix[i_first, i_second]
+                min_pair = (first_order_vec[i_start + i_first], second_order_vec[j_vec[i_second]])
+
+        if min_pair is None:
+            return np.zeros(n_dishes, dtype=self.quantity_vec.dtype), max_price
+
+        min_quantity_vec = np.zeros(n_dishes, dtype=self.quantity_vec.dtype)
+
+        min_quantity_vec[first_half_vec] = first_unit_matrix[min_pair[0]]
+        min_quantity_vec[second_half_vec] = second_unit_matrix[min_pair[1]]
+
+        # the price is summed over dishes again, so that it does not depend on the order of additions
+
+        return min_quantity_vec, self.value_matrix[:, 0] @ min_quantity_vec
@@ -1,5 +1,7 @@
 import json
 
+from datetime import datetime
+
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
@@ -10,6 +12,7 @@ class MongoConnector:
 
     DB_NAME = "vkusvill_bot"
     USERS_COLL_NAME = "users"
+    SOLUTIONS_COLL_NAME = "solutions"
 
     def __init__(self, uri=URI):
 
@@ -17,6 +20,7 @@ class MongoConnector:
 
         self.db = self.client[self.DB_NAME]
         self.users_coll = self.db[self.USERS_COLL_NAME]
+        self.solutions_coll = self.db[self.SOLUTIONS_COLL_NAME]
 
     def get_config(self, user_id):
 
@@ -35,6 +39,36 @@ class MongoConnector:
 
         self.users_coll.update_one(user_filter, {"$set": config}, upsert=True)
 
+    def get_solution(self, key):
+
+        # the time of the last use is updated on reading, it is the order of eviction
+
+        return self.solutions_coll.find_one_and_update(
+            {"_id": key},
+            {"$set": {"last_used": datetime.utcnow()}}
+        )
+
+    def set_solution(self, solution, key, max_size, ttl):
+
+        # MongoDB removes expired solutions itself, the least recently used ones are removed here
+
+        self.solutions_coll.create_index("last_used", expireAfterSeconds=ttl)
+
+        solution["last_used"] = datetime.utcnow()
+
+        self.solutions_coll.update_one({"_id": key}, {"$set": solution}, upsert=True)
+
+        n_extra = self.solutions_coll.count_documents({}) - max_size
+
+        if n_extra > 0:
+
+            extra_key_list = [
+                value["_id"]
+                for value in self.solutions_coll.find({}, {"_id": 1}).sort("last_used", 1).limit(n_extra)
+            ]
+
+            self.solutions_coll.delete_many({"_id": {"$in": extra_key_list}})
+
     def update_collection(self, filename):
 
         config = json.load(filename.open(encoding="utf-8"))
@@ -1,195 +1,1809 @@
+import os
 import time
+import multiprocessing
+
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 
-from numpy.random import default_rng
+from numpy.random import default_rng
+
+from telegram_handler import TelegramHandler
+from integer_solver import IntegerSolver
+from iterative_solver import IterativeSolver
+from heuristic_solver import HeuristicSolver
+from meet_in_middle_solver import MeetInMiddleSolver
+from transposition_table import TranspositionTable
+from search_progress import SearchProgress
+from solution_cache import SolutionCache
+from pareto_front import ParetoFront
+from plan_store import PlanStore
+from catalog import Catalog
+
+
+class Optimizer:
+
+    N_DISHES = 20
+    BOUNDED_N_DISHES = 100  # bounded and exact solvers prune by nutrient bounds, so they handle much more dishes
+    MAX_ATTEMPTS = 100
+    MAX_SUBSET_DRAWS = 100  # random subsets drawn for one attempt until one passes the feasibility check
+    JOINT_MAX_NODES = 2000  # one node of the joint search solves a linear program over all days
+    JOINT_TIME_BUDGET = 30  # seconds per day of the joint search if no time budget is set
+    PROGRESS_INTERVAL = 10  # seconds between progress messages when the time budget is set
+    BOUNDED_CHECK_INTERVAL = 1 << 12  # nodes of the bounded search are slow, so it checks the deadline more often
+    PARETO_MAX_NODES = 2000  # nodes of one search at a point of the front, narrow bands at its edges are slow to prove
+    REPAIR_MAX_NODES = 2000  # nodes of the search improving a repaired set of the last plan
+
+    SOLVER_MODES = ("recursive", "iterative", "bounded", "exact", "heuristic", "pareto")
+    EXPERIMENTAL_SOLVER_MODES = ("joint",)  # slow on whole catalogs, so the bot and the command line do not offer them
+    SAMPLING_MODES = ("uniform", "stratified")
+    NUTRIENT_COLUMNS = ["calories", "proteins", "fats", "carbo"]
+    SUMMARY_COLUMNS = ["calories", "proteins", "fats", "carbo", "price"]  # totals of shown sets
+
+    EPS = 1e-6
+
+    TRANSPOSITION_STEPS = (100, 10, 10, 10)  # kcal and grams, closer lower bounds share an entry of the table
+
+    def __init__(
+        self,
+        telegram_handler: TelegramHandler,
+        n_days: int,
+        calories_lower: int,
+        calories_upper: int,
+        proteins_lower: int,
+        proteins_upper: int,
+        fats_lower: int,
+        fats_upper: int,
+        carbo_lower: int,
+        carbo_upper: int,
+        start_min_price: int,
+        solver_mode: str,
+        sample_subsets: bool,
+        sampling: str,
+        seed: int,
+        n_workers: int,
+        n_solutions: int,
+        time_budget: float,
+        solution_cache: SolutionCache,
+        pareto_front: ParetoFront,
+        plan_store: PlanStore
+    ):
+
+        if solver_mode not in self.SOLVER_MODES + self.EXPERIMENTAL_SOLVER_MODES:
+            raise ValueError(f"Unknown solver mode '{solver_mode}', choose one of {self.SOLVER_MODES}!")
+
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling '{sampling}', choose one of {self.SAMPLING_MODES}!")
+
+        self.telegram_handler = telegram_handler
+
+        self.n_days = n_days
+
+        self.calories_lower = calories_lower
+        self.calories_upper = calories_upper
+
+        self.proteins_lower = proteins_lower
+        self.proteins_upper = proteins_upper
+
+        self.fats_lower = fats_lower
+        self.fats_upper = fats_upper
+
+        self.carbo_lower = carbo_lower
+        self.carbo_upper = carbo_upper
+
+        self.start_min_price = start_min_price
+
+        self.solver_mode = solver_mode
+        self.sample_subsets = sample_subsets  # otherwise the exact and heuristic solvers take the whole catalog
+
+        self.sampling = sampling  # "stratified" draws more dishes rich in nutrients which are hard to cover
+        self.rng = default_rng(seed)  # one generator for all attempts, a seed makes them reproducible
+
+        self.n_workers = n_workers  # random subsets solved in parallel processes at each attempt
+
+        self.n_solutions = n_solutions  # cheapest sets kept by exact and joint solvers for rejections
+        self.next_solution_list = []  # the rest of them after the last search, as (quantities, price)
+
+        # seconds per day for one search (None is unlimited), after that the best set found by then is shown
+
+        self.time_budget = time_budget
+        self.deadline = None  # time.time() when the current search stops
+        self.next_progress_time = None
+
+        self.solution_cache = solution_cache  # accepted sets for the same catalog and restrictions, may be None
+
+        self.pareto_front = pareto_front  # stored fronts of the pareto mode, may be None (then they are not kept)
+
+        self.plan_store = plan_store  # the last accepted sets of the user, may be None
+
+        self.n_skipped_subsets = 0  # subsets rejected by the feasibility check without search since the launch
+
+        self.min_dict_list = None
+
+        self.rejected_plan_list = []  # sets of all days shown without search and rejected by the user in this launch
+
+        self.n_nodes = None  # nodes explored by the last search (if the solver counts them)
+
+        # the table of the recursive search cuts about 5% of nodes on real catalogs, but its bookkeeping
+        # in every node costs more than it saves, so it is turned on only to measure it (see benchmark.py)
+
+        self.use_transposition_table = False
+        self.transposition_table = None  # the table of the last recursive search, it keeps hit rates
+
+        # recursive and iterative searches are replaced with the meet-in-the-middle one for subsets which fit
+        # its memory budget, benchmark.py turns it off to compare the searches themselves
+
+        self.use_meet_in_middle = True
+        self.engine = None  # the search which solved the last subset
+
+        self.relaxation_price = None  # the lower bound of the optimal price of the last heuristic search
+
+    def remove_dominated_dishes(self, catalog: Catalog) -> Catalog:
+
+        # a dish is dominated if dishes with the same nutrients which cost no more (the earlier ones among equal
+        # prices) have enough units for the largest count of such units that sets of all days can hold:
+        # then units of the dish are swapped for them in any set without breaking a bound or raising the price;
+        # a dish with more nutrients is not a safe swap, since it may break an upper bound or run out of stock
+
+        nutrient_matrix = catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = catalog.record_array["price"]
+        quantity_vec = catalog.record_array["quantity"].astype(np.int64)
+
+        _, upper_vec = self.__get_bound_vecs()
+
+        # a dish exceeding an upper bound on its own can never be in a set
+
+        is_fitting_vec = (nutrient_matrix <= upper_vec).all(axis=1)
+
+        # the most units of one nutrient vector within the upper bounds of all days
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+
+            max_unit_vec = self.n_days * np.where(
+                nutrient_matrix > 0,
+                np.floor(upper_vec / nutrient_matrix + self.EPS),
+                np.inf
+            ).min(axis=1)
+
+        # units of cheaper equal dishes before every dish, dishes are ordered by groups of equal nutrients and prices
+
+        _, group_vec = np.unique(nutrient_matrix, axis=0, return_inverse=True)
+
+        order_vec = np.lexsort((price_vec, group_vec))
+
+        sorted_group_vec = group_vec[order_vec]
+        sorted_quantity_vec = quantity_vec[order_vec]
+
+        before_vec = np.cumsum(sorted_quantity_vec) - sorted_quantity_vec
+
+        group_start_vec = np.searchsorted(sorted_group_vec, sorted_group_vec, side="left")
+
+        cheaper_quantity_vec = np.zeros(catalog.size, dtype=np.int64)
+        cheaper_quantity_vec[order_vec] = before_vec - before_vec[group_start_vec]
+
+        is_dominated_vec = cheaper_quantity_vec >= max_unit_vec
+
+        n_unfitting = int((~is_fitting_vec).sum())
+        n_dominated = int((is_dominated_vec & is_fitting_vec).sum())
+
+        catalog = catalog.select(is_fitting_vec & ~is_dominated_vec)
+
+        self.telegram_handler.log_info(
+            f"Removed {n_dominated} dominated dishes and {n_unfitting} dishes exceeding upper bounds, "
+            f"{catalog.size} dishes left"
+        )
+
+        return catalog
+
+    def launch_optimizer(self, catalog: Catalog) -> dict:
+
+        # the searches work on the record array of the catalog, and the frame indexed by names is built
+        # once per launch for the cache, the plans and the shown sets
+
+        food_df = catalog.get_food_df()
+
+        self.rejected_plan_list = []
+
+        if self.solution_cache is not None:
+
+            food_dict = self.__launch_cached_days(food_df)
+
+            if food_dict is not None:
+
+                self.__set_plan(food_df)
+
+                return food_dict
+
+        if self.plan_store is not None:
+
+            food_dict = self.__launch_planned_days(food_df, catalog)
+
+            if food_dict is not None:
+
+                self.__set_plan(food_df)
+
+                return food_dict
+
+        if self.solver_mode == "joint":
+
+            food_dict = self.__launch_joint_days(food_df, catalog)
+
+        else:
+
+            executor = self.__create_executor(catalog) if self.n_workers > 1 else None
+
+            try:
+
+                food_dict = self.__launch_days(food_df, catalog, executor)
+
+            finally:
+
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+        self.deadline = None
+
+        if (self.solution_cache is not None) and (len(self.min_dict_list) == self.n_days):
+            self.solution_cache.set_solution(food_df, self.__get_restriction_dict(), self.min_dict_list)
+
+        self.__set_plan(food_df)
+
+        return food_dict
+
+    def __set_plan(self, food_df: pd.DataFrame):
+
+        if (self.plan_store is not None) and (len(self.min_dict_list) == self.n_days):
+            self.plan_store.set_plan(food_df, self.__get_restriction_dict(), self.min_dict_list)
+
+    def start_search(self, n_days: int):
+
+        # time waiting for the answer of the user is not counted, so the budget starts with every search
+
+        time_budget = self.__get_time_budget()
+
+        if time_budget is None:
+            return
+
+        self.deadline = time.time() + time_budget * n_days
+        self.next_progress_time = time.time() + self.PROGRESS_INTERVAL
+
+    def __get_time_budget(self):
+
+        # the joint search is slow on whole catalogs, so it always has a budget
+
+        if (self.time_budget is None) and (self.solver_mode == "joint"):
+            return self.JOINT_TIME_BUDGET
+
+        return self.time_budget
+
+    def __is_time_over(self) -> bool:
+
+        return (self.deadline is not None) and (time.time() > self.deadline)
+
+    def __log_progress(self, min_price, n_nodes):
+
+        if time.time() < self.next_progress_time:
+            return
+
+        self.next_progress_time = time.time() + self.PROGRESS_INTERVAL
+
+        self.telegram_handler.log_info(
+            ("No set is found yet" if min_price is None else f"The best price so far is {min_price:.0f} rubles")
+            + f", {n_nodes} nodes explored"
+        )
+
+    def __get_progress_callback(self):
+
+        # solvers call it often, messages are sent once in PROGRESS_INTERVAL,
+        # only searches started by start_search have a deadline and report progress
+        # (workers get the deadline of the search, but not the time of the next message)
+
+        return self.__log_progress if (self.deadline is not None) and (self.next_progress_time is not None) else None
+
+    def __create_search_progress(self, check_interval: int = SearchProgress.CHECK_INTERVAL):
+
+        # searches without a deadline get None and keep the full speed
+
+        if self.deadline is None:
+            return None
+
+        return SearchProgress(self.deadline, self.__get_progress_callback(), self.start_min_price, check_interval)
+
+    def __get_restriction_dict(self) -> dict:
+
+        # everything that changes the sets for the same catalog
+
+        return {
+            "n_days": self.n_days,
+            "calories_lower": self.calories_lower,
+            "calories_upper": self.calories_upper,
+            "proteins_lower": self.proteins_lower,
+            "proteins_upper": self.proteins_upper,
+            "fats_lower": self.fats_lower,
+            "fats_upper": self.fats_upper,
+            "carbo_lower": self.carbo_lower,
+            "carbo_upper": self.carbo_upper,
+            "start_min_price": self.start_min_price,
+            "solver_mode": self.solver_mode,
+        }
+
+    def __launch_cached_days(self, food_df: pd.DataFrame):
+
+        # returns None if there are no accepted sets for this catalog and restrictions or the user rejects them
+
+        min_dict_list = self.solution_cache.get_solution(food_df, self.__get_restriction_dict())
+
+        if min_dict_list is None:
+            return None
+
+        self.telegram_handler.log_info("These sets were accepted before for the same catalog and restrictions")
+
+        return self.__confirm_days(food_df, min_dict_list)
+
+    def __confirm_days(self, food_df: pd.DataFrame, min_dict_list: list):
+
+        # sets of all days found without search are shown at once, returns None if the user rejects them
+
+        self.min_dict_list = min_dict_list
+
+        food_dict = self.__print_optimal_set_info(0, food_df)
+
+        cur_button_list = ["yes", "no"]
+
+        answer = self.telegram_handler.ask_for_input("Do you like your sets?", cur_button_list)
+
+        while answer not in cur_button_list:
+            answer = self.telegram_handler.ask_for_input("Try again!", cur_button_list)
+
+        if answer == "yes":
+            return food_dict
+
+        self.rejected_plan_list.append(min_dict_list)
+
+        self.min_dict_list = None
+
+        return None
+
+    def __launch_planned_days(self, food_df: pd.DataFrame, catalog: Catalog):
+
+        # sets of the last plan are kept for days whose dishes are still in stock at the same or lower price,
+        # and the other days are repaired starting from their old sets; returns None if there is no plan
+        # for these restrictions, some day cannot be repaired or the user rejects the sets
+        #
+        # a dish may be taken on several days (in the joint mode or when it is in stock for more than one set),
+        # so days take their quantities from the stock left after the earlier kept days
+
+        triple_list_list = self.plan_store.get_plan(self.__get_restriction_dict())
+
+        if triple_list_list is None:
+            return None
+
+        min_dict_list = [
+            {name: quantity for name, quantity, _ in triple_list}
+            for triple_list in triple_list_list
+        ]
+
+        left_quantity_series = food_df["quantity"].copy()
+
+        repaired_day_list = []
+
+        for i_day, triple_list in enumerate(triple_list_list):
+
+            if not self.__is_planned_day_valid(food_df, triple_list, left_quantity_series):
+
+                repaired_day_list.append(i_day)
+
+                continue
+
+            for name, quantity, _ in triple_list:
+                left_quantity_series[name] -= quantity
+
+        for i_day in repaired_day_list:
+
+            # the stock left after the kept days and the days repaired before
+
+            self.start_search(1)
+
+            min_dict = self.__repair_day(catalog.set_quantity(left_quantity_series.values), min_dict_list[i_day])
+
+            self.deadline = None
+
+            if min_dict is None:
+
+                self.telegram_handler.log_info(f"The set of day {i_day + 1} of the last plan cannot be repaired")
+
+                return None
+
+            min_dict_list[i_day] = min_dict
+
+            for name, quantity in min_dict.items():
+                left_quantity_series[name] -= quantity
+
+        # the accepted plan is usually in the solution cache too, so the same sets are not asked about twice
+
+        if min_dict_list in self.rejected_plan_list:
+
+            self.telegram_handler.log_info("Sets of the last plan are the rejected ones, so they are searched again")
+
+            return None
+
+        self.telegram_handler.log_info(
+            f"Sets of the last plan are still in stock at the same or lower price for "
+            f"{self.n_days - len(repaired_day_list)} days, {len(repaired_day_list)} days are repaired"
+        )
+
+        return self.__confirm_days(food_df, min_dict_list)
+
+    def __is_planned_day_valid(self, food_df: pd.DataFrame, triple_list: list, left_quantity_series: pd.Series) -> bool:
+
+        for name, quantity, price in triple_list:
+
+            if name not in food_df.index:
+                return False
+
+            if (left_quantity_series[name] < quantity) or (food_df.at[name, "price"] > price + self.EPS):
+                return False
+
+        # nutrients of dishes may be corrected by the parser, so the bands are checked again
+
+        name_list = [name for name, _, _ in triple_list]
+        quantity_vec = np.array([quantity for _, quantity, _ in triple_list])
+
+        sum_vec = food_df.loc[name_list, self.NUTRIENT_COLUMNS].values.T @ quantity_vec
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        return bool(np.all(sum_vec >= lower_vec - self.EPS) and np.all(sum_vec <= upper_vec + self.EPS))
+
+    def __repair_day(self, sliced_catalog: Catalog, old_min_dict: dict):
+
+        # the old set cut to the stock is improved by the local search of the heuristic solver,
+        # and its result is the first incumbent of a short exact search; returns None if there is no set
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
+
+        old_quantity_vec = np.minimum(
+            np.array([old_min_dict.get(name, 0) for name in sliced_catalog.get_names()], dtype=int),
+            quantity_vec
+        )
+
+        time_limit = HeuristicSolver.TIME_LIMIT
+
+        if self.deadline is not None:
+            time_limit = max(min(time_limit, self.deadline - time.time()), 0)
+
+        start_quantity_vec, start_price = HeuristicSolver(
+            nutrient_matrix=nutrient_matrix,
+            price_vec=price_vec,
+            quantity_vec=quantity_vec,
+            lower_vec=lower_vec,
+            upper_vec=upper_vec,
+            rng=self.rng,
+            time_limit=time_limit
+        ).solve(self.start_min_price, old_quantity_vec)
+
+        integer_solver = IntegerSolver(
+            nutrient_matrix=nutrient_matrix,
+            price_vec=price_vec,
+            quantity_vec=quantity_vec,
+            lower_vec=lower_vec,
+            upper_vec=upper_vec,
+            max_nodes=self.REPAIR_MAX_NODES,
+            deadline=self.deadline
+        )
+
+        min_quantity_vec, min_price = integer_solver.solve(
+            self.start_min_price,
+            start_quantity_vec if start_price < self.start_min_price else None
+        )
+
+        if min_price == self.start_min_price:
+            return None
+
+        return self.__get_min_dict(sliced_catalog, min_quantity_vec)
+
+    def __create_executor(self, catalog: Catalog) -> ProcessPoolExecutor:
+
+        # the bot works in many threads, so workers are forked from a clean single-threaded server;
+        # the catalog is sent to every worker once, and tasks are only positions of dishes in it
+
+        worker_params = {
+            "n_days": 1,
+            "calories_lower": self.calories_lower,
+            "calories_upper": self.calories_upper,
+            "proteins_lower": self.proteins_lower,
+            "proteins_upper": self.proteins_upper,
+            "fats_lower": self.fats_lower,
+            "fats_upper": self.fats_upper,
+            "carbo_lower": self.carbo_lower,
+            "carbo_upper": self.carbo_upper,
+            "start_min_price": self.start_min_price,
+            "solver_mode": "exact" if self.solver_mode == "pareto" else self.solver_mode,
+            "sample_subsets": True,
+            "sampling": self.sampling,
+            "seed": None,
+            "n_workers": 1,
+            "n_solutions": 1,
+            "time_budget": None,
+            "solution_cache": None,
+            "pareto_front": None,
+            "plan_store": None,
+        }
+
+        return ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_initialize_worker,
+            initargs=(catalog, worker_params)
+        )
+
+    def __launch_days(self, food_df: pd.DataFrame, catalog: Catalog, executor) -> dict:
+
+        # the catalog loses dishes of earlier days, food_df keeps all of them for the shown sets
+
+        min_dict_list = []
+        min_price_list = []
+
+        position_vec = np.arange(catalog.size)  # positions of dishes in the catalog of workers
+
+        self.n_skipped_subsets = 0
+
+        n_dishes = self.N_DISHES if self.solver_mode in ("recursive", "iterative") else self.BOUNDED_N_DISHES
+
+        for i_day in range(self.n_days):
+
+            cur_min_dict = None
+            cur_min_price = None
+
+            self.telegram_handler.log_info(f"Day {i_day + 1}")
+
+            sampling_dict = self.__get_sampling_dict(catalog)  # dishes of earlier days are left out of it
+
+            start_time = time.time()
+
+            is_optimized = False
+
+            is_rejected = False
+
+            n_attempts = 0
+
+            solution_list = []  # the next cheapest sets of the last search as (numbers, quantities, price)
+
+            n_skipped_subsets = self.n_skipped_subsets
+
+            while not is_optimized:
+
+                cur_min_price = self.start_min_price
+
+                cur_min_dict = None
+
+                if solution_list:
+
+                    # after a rejection the next set of the last search is shown without a new search
+
+                    number_vec, cur_min_quantity_vec, cur_min_price = solution_list.pop(0)
+
+                    self.telegram_handler.log_info("The next cheapest set of the last search")
+
+                    cur_min_dict = self.__get_min_dict(catalog.select(number_vec), cur_min_quantity_vec)
+
+                if cur_min_dict is None:
+                    self.start_search(1)
+
+                while cur_min_price == self.start_min_price:
+
+                    size = catalog.size
+
+                    # random subsets give different sets for different days and after rejections
+
+                    is_whole_catalog = (self.solver_mode in ("exact", "heuristic", "pareto")) and \
+                        not (self.sample_subsets or is_rejected)
+
+                    if is_whole_catalog:
+
+                        number_vec_list = [np.arange(size), ]
+
+                    else:
+
+                        number_vec_list = [
+                            self.__sample_subset(sampling_dict, n_dishes)
+                            for _ in range(self.n_workers if executor is not None else 1)
+                        ]
+
+                    if len(number_vec_list) == 1:
+
+                        self.telegram_handler.log_info(f"Attempt {n_attempts + 1}")
+
+                        number_vec = number_vec_list[0]
+
+                        if is_whole_catalog or (self.solver_mode != "pareto"):
+
+                            cur_min_quantity_vec, cur_min_price = self.solve_subset(catalog.select(number_vec))
+
+                        else:
+
+                            # fronts are kept for whole catalogs, random subsets after rejections are solved exactly
+
+                            self.engine = "exact"
+
+                            cur_min_quantity_vec, cur_min_price = self.__launch_exact_search(
+                                catalog.select(number_vec)
+                            )
+
+                        solution_list = [
+                            (number_vec, quantity_vec, price) for quantity_vec, price in self.next_solution_list
+                        ]
+
+                    else:
+
+                        self.telegram_handler.log_info(
+                            f"Attempts {n_attempts + 1}-{n_attempts + len(number_vec_list)} in parallel"
+                        )
+
+                        number_vec, cur_min_quantity_vec, cur_min_price = self.__solve_subsets_in_parallel(
+                            number_vec_list,
+                            position_vec,
+                            executor
+                        )
+
+                    cur_min_dict = self.__get_min_dict(catalog.select(number_vec), cur_min_quantity_vec)
+
+                    n_attempts += len(number_vec_list)
+
+                    # the heuristic solver may find a set at the next attempt, the exact one may not
+
+                    if is_whole_catalog and (self.solver_mode in ("exact", "pareto")) and \
+                       (cur_min_price == self.start_min_price):
+                        n_attempts = self.MAX_ATTEMPTS  # there is no cheaper set in the whole catalog
+
+                    if self.__is_time_over() and (cur_min_price == self.start_min_price):
+
+                        self.telegram_handler.log_info(f"Time budget of {self.time_budget} sec is over")
+
+                        n_attempts = self.MAX_ATTEMPTS
+
+                    if n_attempts >= self.MAX_ATTEMPTS:
+                        self.telegram_handler.log_info(
+                            'It is impossible to assemble a daily '
+                            'food out of the rest products!'
+                        )
+
+                        break
+
+                if n_attempts >= self.MAX_ATTEMPTS:
+                    break
+
+                self.min_dict_list = [cur_min_dict, ]
+
+                self.__print_optimal_set_info(i_day, food_df)
+
+                cur_button_list = ["yes", "no"]
+
+                answer = self.telegram_handler.ask_for_input("Do you like your set?", cur_button_list)
+
+                while True:
+
+                    if answer == "yes":
+
+                        is_optimized = True
+
+                        break
+
+                    if answer == "no":
+
+                        is_rejected = True
+
+                        break
+
+                    answer = self.telegram_handler.ask_for_input("Try again!", cur_button_list)
+
+            if n_attempts >= self.MAX_ATTEMPTS:
+                break
+
+            self.telegram_handler.log_info(f"Optimization finished for day {i_day + 1}!")
+
+            if self.n_skipped_subsets > n_skipped_subsets:
+                self.telegram_handler.log_info(
+                    f"Feasibility check skipped {self.n_skipped_subsets - n_skipped_subsets} hopeless subsets "
+                    f"on day {i_day + 1}"
+                )
+
+            min_dict_list.append(cur_min_dict)
+            min_price_list.append(cur_min_price)
+
+            is_left_vec = ~np.isin(catalog.get_names(), list(cur_min_dict.keys()))
+
+            catalog = catalog.select(is_left_vec)
+            position_vec = position_vec[is_left_vec]
+
+            self.telegram_handler.log_info(
+                f"Time elapsed on day {i_day + 1}: {time.time() - start_time: .2f} sec"
+            )
+
+        self.min_dict_list = min_dict_list
+
+        food_dict = self.__print_optimal_set_info(0, food_df)
+
+        return food_dict
+
+    def __get_sampling_dict(self, catalog: Catalog) -> dict:
+
+        # arrays of the catalog which every draw of a subset needs, they are taken once per catalog
+        # instead of once per draw
+
+        nutrient_matrix = catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = catalog.record_array["price"]
+
+        # every dish belongs to the stratum of the nutrient it gives the most of per ruble (compared with
+        # the median dish)
+
+        density_matrix = nutrient_matrix / price_vec[:, None]
+
+        median_vec = np.maximum(np.median(density_matrix, axis=0), self.EPS)
+
+        return {
+            "nutrient_matrix": nutrient_matrix,
+            "price_vec": price_vec,
+            "quantity_vec": catalog.record_array["quantity"],
+            "median_vec": median_vec,
+            "stratum_vec": np.argmax(density_matrix / median_vec, axis=1),
+        }
+
+    def __sample_subset(self, sampling_dict: dict, n_dishes: int) -> np.ndarray:
+
+        # subsets which cannot give a set cheaper than start_min_price are drawn again,
+        # the last one is returned anyway, so that the attempt is still made
+
+        for _ in range(self.MAX_SUBSET_DRAWS):
+
+            number_vec = self.__draw_subset(sampling_dict, n_dishes)
+
+            min_cover_price = self.get_min_cover_price(
+                sampling_dict["nutrient_matrix"][number_vec],
+                sampling_dict["price_vec"][number_vec],
+                sampling_dict["quantity_vec"][number_vec]
+            )
+
+            if min_cover_price - self.EPS < self.start_min_price:
+                break
+
+            self.n_skipped_subsets += 1
+
+        return number_vec
+
+    def __draw_subset(self, sampling_dict: dict, n_dishes: int) -> np.ndarray:
+
+        size = sampling_dict["price_vec"].size
+
+        n_dishes = min(n_dishes, size)
+
+        lower_vec, _ = self.__get_bound_vecs()
+
+        if (self.sampling == "uniform") or not np.any(lower_vec > 0):
+            return self.rng.choice(size, size=n_dishes, replace=False)
+
+        # strata get shares of the subset proportional to the rubles needed to cover the lower bound
+        # of their nutrient with median dishes, and dishes inside strata are drawn uniformly
+
+        median_vec = sampling_dict["median_vec"]
+        stratum_vec = sampling_dict["stratum_vec"]
+
+        share_vec = np.maximum(lower_vec, 0) / median_vec
+        share_vec = share_vec / share_vec.sum()
+
+        # the largest remainder method
+
+        n_stratum_vec = np.floor(share_vec * n_dishes).astype(int)
+
+        remainder_vec = share_vec * n_dishes - n_stratum_vec
+
+        n_stratum_vec[np.argsort(-remainder_vec, kind="stable")[:n_dishes - n_stratum_vec.sum()]] += 1
+
+        number_vec_list = []
+
+        for i_stratum, n_stratum_dishes in enumerate(n_stratum_vec):
+
+            stratum_number_vec = np.flatnonzero(stratum_vec == i_stratum)
+
+            number_vec_list.append(
+                self.rng.choice(stratum_number_vec, size=min(n_stratum_dishes, stratum_number_vec.size), replace=False)
+            )
+
+        number_vec = np.concatenate(number_vec_list)
+
+        # small strata are filled up with any other dishes
+
+        rest_number_vec = np.setdiff1d(np.arange(size), number_vec)
+
+        return np.concatenate([
+            number_vec,
+            self.rng.choice(rest_number_vec, size=n_dishes - number_vec.size, replace=False)
+        ])
+
+    def get_min_cover_price(self, nutrient_matrix: np.ndarray, price_vec: np.ndarray, quantity_vec: np.ndarray):
+
+        # every lower bound is covered separately by the dishes with the lowest price per unit of the nutrient,
+        # the last one fractionally: it is the linear relaxation with one row, so no set of these dishes is cheaper;
+        # the price is infinite if even all units of dishes do not reach some lower bound
+
+        lower_vec, _ = self.__get_bound_vecs()
+
+        min_cover_price = 0.
+
+        for i_nutrient in np.flatnonzero(lower_vec > 0):
+
+            value_vec = nutrient_matrix[:, i_nutrient]
+
+            is_useful_vec = value_vec > 0
+
+            value_vec = value_vec[is_useful_vec]
+            cur_price_vec = price_vec[is_useful_vec]
+            cur_quantity_vec = quantity_vec[is_useful_vec]
+
+            ratio_vec = cur_price_vec / value_vec
+
+            order_vec = np.argsort(ratio_vec, kind="stable")
+
+            cum_value_vec = np.cumsum((value_vec * cur_quantity_vec)[order_vec])
+            cum_price_vec = np.cumsum((cur_price_vec * cur_quantity_vec)[order_vec])
+
+            i_last = np.searchsorted(cum_value_vec, lower_vec[i_nutrient])
+
+            if i_last == cum_value_vec.size:
+                return np.inf
+
+            prev_value = cum_value_vec[i_last - 1] if i_last > 0 else 0.
+            prev_price = cum_price_vec[i_last - 1] if i_last > 0 else 0.
+
+            min_cover_price = max(
+                min_cover_price,
+                prev_price + (lower_vec[i_nutrient] - prev_value) * ratio_vec[order_vec[i_last]]
+            )
+
+        return min_cover_price
+
+    @staticmethod
+    def __get_min_dict(sliced_catalog: Catalog, quantity_vec: np.ndarray) -> dict:
+
+        cur_min_name_list = sliced_catalog.select(quantity_vec > 0).get_names()
+
+        cur_min_quantity_vec = quantity_vec[quantity_vec > 0]
+
+        return pd.Series(cur_min_quantity_vec, index=cur_min_name_list).to_dict()
+
+    def __solve_subsets_in_parallel(
+        self,
+        number_vec_list: list,
+        position_vec: np.ndarray,
+        executor: ProcessPoolExecutor
+    ) -> tuple:
+
+        start_time = time.time()
+
+        result_list = list(executor.map(
+            _solve_subset_in_worker,
+            [position_vec[number_vec] for number_vec in number_vec_list],
+            [self.deadline] * len(number_vec_list)
+        ))
+
+        worker_time_dict = {}
+        worker_count_dict = {}
+
+        min_number_vec = number_vec_list[0]
+        min_quantity_vec, min_price, _, _ = result_list[0]
+
+        for number_vec, (quantity_vec, price, worker_id, worker_time) in zip(number_vec_list, result_list):
+
+            worker_time_dict[worker_id] = worker_time_dict.get(worker_id, 0) + worker_time
+            worker_count_dict[worker_id] = worker_count_dict.get(worker_id, 0) + 1
+
+            if price < min_price:
+
+                min_number_vec = number_vec
+                min_quantity_vec = quantity_vec
+                min_price = price
+
+        self.telegram_handler.log_info(
+            f"Solved {len(number_vec_list)} subsets on {len(worker_time_dict)} workers "
+            f"in {time.time() - start_time:.2f} sec:\n" + "\n".join([
+                f" - worker {worker_id}: {worker_count_dict[worker_id]} subsets, {worker_time:.2f} sec"
+                for worker_id, worker_time in worker_time_dict.items()
+            ])
+        )
+
+        return min_number_vec, min_quantity_vec, min_price
+
+    def __launch_joint_days(self, food_df: pd.DataFrame, catalog: Catalog) -> dict:
+
+        # all days are optimized at once, so they share quantities of dishes instead of
+        # taking dishes away from the next days one by one
+
+        self.telegram_handler.log_info(f"Optimizing {self.n_days} days at once")
+
+        start_time = time.time()
+
+        self.min_dict_list = []
+
+        is_rejected = False
+
+        n_attempts = 0
+
+        solution_list = []  # the next cheapest sets of the last search as (numbers, quantities, price)
+
+        sampling_dict = self.__get_sampling_dict(catalog)
+
+        while n_attempts < self.MAX_ATTEMPTS:
+
+            if solution_list:
+
+                # after a rejection the next sets of the last search are shown without a new search
+
+                number_vec, quantity_matrix, min_price = solution_list.pop(0)
+
+                self.telegram_handler.log_info("The next cheapest sets of the last search")
+
+            else:
+
+                size = catalog.size
+
+                # random subsets give different sets after rejections
+
+                if is_rejected:
+                    number_vec = self.__draw_subset(sampling_dict, self.BOUNDED_N_DISHES)
+                else:
+                    number_vec = np.arange(size)
+
+                self.telegram_handler.log_info(f"Attempt {n_attempts + 1}")
+
+                self.start_search(self.n_days)
+
+                quantity_matrix, min_price = self.solve_days(catalog.select(number_vec))
+
+                solution_list = [
+                    (number_vec, next_quantity_matrix, price)
+                    for next_quantity_matrix, price in self.next_solution_list
+                ]
+
+                n_attempts += 1
+
+                if min_price == self.start_min_price * self.n_days:
+
+                    if not is_rejected:
+                        n_attempts = self.MAX_ATTEMPTS  # there are no cheaper sets in the whole catalog
+
+                    if self.__is_time_over():
+
+                        self.telegram_handler.log_info(
+                            f"Time budget of {self.__get_time_budget() * self.n_days} sec is over"
+                        )
+
+                        n_attempts = self.MAX_ATTEMPTS
+
+                    continue
+
+            self.min_dict_list = [
+                self.__get_min_dict(catalog.select(number_vec), quantity_vec) for quantity_vec in quantity_matrix
+            ]
+
+            food_dict = self.__print_optimal_set_info(0, food_df)
+
+            cur_button_list = ["yes", "no"]
+
+            answer = self.telegram_handler.ask_for_input("Do you like your sets?", cur_button_list)
+
+            while answer not in cur_button_list:
+                answer = self.telegram_handler.ask_for_input("Try again!", cur_button_list)
+
+            if answer == "yes":
+
+                self.telegram_handler.log_info(
+                    f"Optimization finished, time elapsed: {time.time() - start_time: .2f} sec"
+                )
+
+                return food_dict
+
+            is_rejected = True
+
+        self.telegram_handler.log_info(
+            'It is impossible to assemble a daily '
+            'food out of the rest products!'
+        )
+
+        self.min_dict_list = []
+
+        return food_df.to_dict('index')
+
+    def solve_days(self, sliced_catalog: Catalog) -> tuple:
+
+        # one search over quantities of all dishes for all days (day-major order), returns
+        # the matrix of quantities (a row per day) and the total price
+
+        self.engine = "joint"
+
+        n_dishes = sliced_catalog.size
+
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        # the day-by-day sets over the rest quantities are the first known solution of the joint search,
+        # and the cheapest set of one day over the whole stock is the lowest price of every day
+
+        start_quantity_matrix, min_day_price = self.__solve_days_one_by_one(sliced_catalog)
+
+        if min_day_price == np.inf:
+
+            self.n_nodes = 0
+            self.next_solution_list = []
+
+            self.telegram_handler.log_info("There is no daily set even over the whole stock")
+
+            return np.zeros((self.n_days, n_dishes), dtype=int), self.start_min_price * self.n_days
+
+        # no other day costs less, so a day of cheaper sets costs less than the day-by-day sets without
+        # the lowest prices of the other days; this bounds the relaxation much tighter than the prices alone
+
+        max_day_price = self.start_min_price
+
+        if (start_quantity_matrix is not None) and np.isfinite(min_day_price):
+
+            start_price = float(price_vec @ start_quantity_matrix.sum(axis=0))
+
+            max_day_price = min(max_day_price, start_price - (self.n_days - 1) * min_day_price)
+
+            if (self.n_solutions == 1) and (start_price <= self.n_days * min_day_price + self.EPS):
+
+                self.n_nodes = 0
+                self.next_solution_list = []
+
+                self.telegram_handler.log_info(
+                    f"Day-by-day sets cost {int(start_price)} rubles, {self.n_days} times the cheapest daily set, "
+                    f"so they are optimal without the joint search"
+                )
+
+                return start_quantity_matrix, start_price
+
+        # rows are nutrients and prices of every day (within the bounds above), total quantities of dishes
+        # over all days and differences of prices of neighbouring days: cheaper days go first, so equal days
+        # are not swapped
+
+        row_matrix_list = [
+            np.kron(np.eye(self.n_days), nutrient_matrix),
+            np.kron(np.eye(self.n_days), price_vec[:, None]),
+        ]
+        row_lower_vec_list = [np.tile(lower_vec, self.n_days), np.full(self.n_days, min_day_price)]
+        row_upper_vec_list = [np.tile(upper_vec, self.n_days), np.full(self.n_days, max_day_price)]
+
+        if self.n_days > 1:
+
+            price_order_matrix = np.eye(self.n_days, self.n_days - 1) - np.eye(self.n_days, self.n_days - 1, k=-1)
+
+            row_matrix_list += [
+                np.tile(np.eye(n_dishes), (self.n_days, 1)),
+                np.kron(price_order_matrix, price_vec[:, None]),
+            ]
+            row_lower_vec_list += [np.zeros(n_dishes), np.full(self.n_days - 1, -np.inf)]
+            row_upper_vec_list += [quantity_vec, np.zeros(self.n_days - 1)]
+
+        integer_solver = IntegerSolver(
+            nutrient_matrix=np.hstack(row_matrix_list),
+            price_vec=np.tile(price_vec, self.n_days),
+            quantity_vec=np.tile(quantity_vec, self.n_days),
+            lower_vec=np.concatenate(row_lower_vec_list),
+            upper_vec=np.concatenate(row_upper_vec_list),
+            max_nodes=self.JOINT_MAX_NODES,
+            n_solutions=self.n_solutions,
+            deadline=self.deadline,
+            progress_callback=self.__get_progress_callback()
+        )
+
+        min_quantity_vec, min_price = integer_solver.solve(
+            self.start_min_price * self.n_days,
+            None if start_quantity_matrix is None else start_quantity_matrix.ravel()
+        )
+
+        self.n_nodes = integer_solver.n_nodes
+
+        self.next_solution_list = [
+            (quantity_vec.reshape(self.n_days, n_dishes), price)
+            for quantity_vec, price in integer_solver.solution_list[1:]
+        ]
+
+        self.telegram_handler.log_info(
+            f"Joint solver explored {integer_solver.n_nodes} nodes over {n_dishes} dishes and {self.n_days} days"
+            + (
+                "" if integer_solver.is_optimal else
+                ", node limit or time budget is reached, so the sets may be not optimal"
+            )
+            + (
+                "" if start_quantity_matrix is None else
+                f", day-by-day sets cost {int(price_vec @ start_quantity_matrix.sum(axis=0))} rubles"
+            )
+        )
+
+        return min_quantity_vec.reshape(self.n_days, n_dishes), min_price
+
+    def __solve_days_one_by_one(self, sliced_catalog: Catalog) -> tuple:
+
+        # returns the matrix of quantities (None if some day has no set) and the price of the first day
+        # if it is proven to be the cheapest one over the whole stock (-inf otherwise, inf if it is proven
+        # that there is no set)
+
+        min_day_price = -np.inf
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        rest_quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
+
+        quantity_vec_list = []
+
+        for _ in range(self.n_days):
+
+            integer_solver = IntegerSolver(
+                nutrient_matrix=nutrient_matrix,
+                price_vec=price_vec,
+                quantity_vec=rest_quantity_vec,
+                lower_vec=lower_vec,
+                upper_vec=upper_vec,
+                deadline=self.deadline
+            )
+
+            quantity_vec, price = integer_solver.solve(self.start_min_price)
+
+            is_first_proven = (not quantity_vec_list) and integer_solver.is_optimal
+
+            if price == self.start_min_price:
+                return None, np.inf if is_first_proven else min_day_price
+
+            if is_first_proven:
+                min_day_price = price
+
+            quantity_vec_list.append(quantity_vec)
+
+            rest_quantity_vec = rest_quantity_vec - quantity_vec
+
+        return np.array(quantity_vec_list), min_day_price
+
+    def solve_subset(self, sliced_catalog: Catalog) -> tuple:
+
+        self.n_nodes = None
+        self.next_solution_list = []
+
+        self.engine = self.solver_mode
+
+        if (self.solver_mode in ("recursive", "iterative")) and \
+           self.use_meet_in_middle and \
+           MeetInMiddleSolver.fits(sliced_catalog.record_array["quantity"]):
+
+            self.engine = "meet_in_middle"
+
+            return self.__launch_meet_in_middle_search(sliced_catalog)
+
+        if self.solver_mode == "iterative":
+            return self.__launch_iterative_search(sliced_catalog)
+
+        if self.solver_mode == "bounded":
+            return self.__launch_bounded_search(sliced_catalog)
+
+        if self.solver_mode in ("exact", "joint"):
+            return self.__launch_exact_search(sliced_catalog)
+
+        if self.solver_mode == "heuristic":
+            return self.__launch_heuristic_search(sliced_catalog)
+
+        if self.solver_mode == "pareto":
+            return self.__launch_pareto_search(sliced_catalog)
+
+        record_array = sliced_catalog.record_array
+
+        calories_vec = record_array["calories"]
+        proteins_vec = record_array["proteins"]
+        fats_vec = record_array["fats"]
+        carbo_vec = record_array["carbo"]
+        price_vec = record_array["price"]
+        quantity_vec = record_array["quantity"].astype(int)
+
+        cur_price = 0
+
+        min_quantity_vec = np.zeros_like(quantity_vec)
+
+        rest_quantity_vec = quantity_vec.copy()
+
+        transposition_table = TranspositionTable(self.TRANSPOSITION_STEPS) if self.use_transposition_table else None
+
+        search_progress = self.__create_search_progress()
+
+        min_quantity_vec, min_price = self.__optimize(
+            0,
+            calories_vec,
+            proteins_vec,
+            fats_vec,
+            carbo_vec,
+            price_vec,
+            quantity_vec,
+            self.calories_lower,
+            self.calories_upper,
+            self.proteins_lower,
+            self.proteins_upper,
+            self.fats_lower,
+            self.fats_upper,
+            self.carbo_lower,
+            self.carbo_upper,
+            rest_quantity_vec,
+            cur_price,
+            min_quantity_vec,
+            self.start_min_price,
+            transposition_table,
+            search_progress
+        )
+
+        self.n_nodes = None if search_progress is None else search_progress.n_nodes
+
+        if self.__is_time_over():
+            self.telegram_handler.log_info("Time budget is over, so the set may be not optimal")
+
+        self.transposition_table = transposition_table
+
+        if transposition_table is not None:
+            self.telegram_handler.log_info(
+                f"Transposition table: {transposition_table.get_hit_rate():.1%} of "
+                f"{transposition_table.n_lookups} lookups hit, {transposition_table.n_cutoffs} subtrees cut, "
+                f"{transposition_table.n_saved_nodes} of {transposition_table.n_nodes} nodes saved"
+            )
+
+        return min_quantity_vec, min_price
 
-from telegram_handler import TelegramHandler
-from parser import Parser
+    def __get_bound_vecs(self) -> tuple:
 
+        lower_vec = np.array(
+            [self.calories_lower, self.proteins_lower, self.fats_lower, self.carbo_lower],
+            dtype=np.float64
+        )
+        upper_vec = np.array(
+            [self.calories_upper, self.proteins_upper, self.fats_upper, self.carbo_upper],
+            dtype=np.float64
+        )
 
-class Optimizer:
+        return lower_vec, upper_vec
 
-    N_DISHES = 20
-    MAX_ATTEMPTS = 100
+    def __launch_iterative_search(self, sliced_catalog: Catalog) -> tuple:
 
-    def __init__(
-        self,
-        telegram_handler: TelegramHandler,
-        n_days: int,
-        calories_lower: int,
-        calories_upper: int,
-        proteins_lower: int,
-        proteins_upper: int,
-        fats_lower: int,
-        fats_upper: int,
-        carbo_lower: int,
-        carbo_upper: int,
-        start_min_price: int,
-        parser: Parser
-    ):
+        lower_vec, upper_vec = self.__get_bound_vecs()
 
-        self.telegram_handler = telegram_handler
+        iterative_solver = IterativeSolver(
+            nutrient_matrix=sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS),
+            price_vec=sliced_catalog.record_array["price"],
+            quantity_vec=sliced_catalog.record_array["quantity"].astype(int),
+            lower_vec=lower_vec,
+            upper_vec=upper_vec,
+            deadline=self.deadline,
+            progress_callback=self.__get_progress_callback()
+        )
 
-        self.n_days = n_days
+        min_quantity_vec, min_price = iterative_solver.solve(self.start_min_price)
 
-        self.calories_lower = calories_lower
-        self.calories_upper = calories_upper
+        self.n_nodes = iterative_solver.n_nodes
 
-        self.proteins_lower = proteins_lower
-        self.proteins_upper = proteins_upper
+        if not iterative_solver.is_optimal:
+            self.telegram_handler.log_info(
+                f"Iterative solver explored {iterative_solver.n_nodes} nodes, "
+                f"time budget is over, so the set may be not optimal"
+            )
 
-        self.fats_lower = fats_lower
-        self.fats_upper = fats_upper
+        return min_quantity_vec, min_price
 
-        self.carbo_lower = carbo_lower
-        self.carbo_upper = carbo_upper
+    def __launch_meet_in_middle_search(self, sliced_catalog: Catalog) -> tuple:
 
-        self.start_min_price = start_min_price
+        lower_vec, upper_vec = self.__get_bound_vecs()
 
-        self.parser = parser
+        meet_in_middle_solver = MeetInMiddleSolver(
+            nutrient_matrix=sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS),
+            price_vec=sliced_catalog.record_array["price"],
+            quantity_vec=sliced_catalog.record_array["quantity"].astype(int),
+            lower_vec=lower_vec,
+            upper_vec=upper_vec
+        )
 
-        self.min_dict_list = None
+        return meet_in_middle_solver.solve(self.start_min_price)
 
-    def launch_optimizer(self, food_df: pd.DataFrame) -> dict:
+    def __launch_exact_search(self, sliced_catalog: Catalog) -> tuple:
 
-        min_dict_list = []
-        min_price_list = []
+        lower_vec, upper_vec = self.__get_bound_vecs()
 
-        food_copy_df = food_df.copy()
+        integer_solver = IntegerSolver(
+            nutrient_matrix=sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS),
+            price_vec=sliced_catalog.record_array["price"],
+            quantity_vec=sliced_catalog.record_array["quantity"].astype(int),
+            lower_vec=lower_vec,
+            upper_vec=upper_vec,
+            n_solutions=self.n_solutions,
+            deadline=self.deadline,
+            progress_callback=self.__get_progress_callback()
+        )
 
-        for i_day in range(self.n_days):
+        min_quantity_vec, min_price = integer_solver.solve(self.start_min_price)
 
-            cur_min_dict = None
-            cur_min_price = None
+        self.n_nodes = integer_solver.n_nodes
 
-            self.telegram_handler.log_info(f"Day {i_day + 1}")
+        self.next_solution_list = integer_solver.solution_list[1:]
 
-            start_time = time.time()
+        self.telegram_handler.log_info(
+            f"Exact solver explored {integer_solver.n_nodes} nodes over {sliced_catalog.size} dishes"
+            + (
+                "" if integer_solver.is_optimal else
+                ", node limit or time budget is reached, so the set may be not optimal"
+            )
+        )
 
-            is_optimized = False
+        return min_quantity_vec, min_price
 
-            n_attempts = 0
+    def __launch_heuristic_search(self, sliced_catalog: Catalog) -> tuple:
 
-            while not is_optimized:
+        lower_vec, upper_vec = self.__get_bound_vecs()
 
-                cur_min_price = self.start_min_price
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
 
-                cur_min_dict = None
+        time_limit = HeuristicSolver.TIME_LIMIT
 
-                while cur_min_price == self.start_min_price:
+        if self.deadline is not None:
+            time_limit = max(min(time_limit, self.deadline - time.time()), 0)
 
-                    self.telegram_handler.log_info(f"Attempt {n_attempts + 1}")
+        heuristic_solver = HeuristicSolver(
+            nutrient_matrix=nutrient_matrix,
+            price_vec=price_vec,
+            quantity_vec=quantity_vec,
+            lower_vec=lower_vec,
+            upper_vec=upper_vec,
+            rng=self.rng,
+            time_limit=time_limit
+        )
 
-                    rng = default_rng()
+        min_quantity_vec, min_price = heuristic_solver.solve(self.start_min_price)
 
-                    size = food_df.index.size
-                    number_vec = rng.choice(
-                        size,
-                        size=min(self.N_DISHES, size),
-                        replace=False
-                    )
+        # the optimal price is not known without the exact search, but the linear relaxation is its lower bound,
+        # so the gap to the relaxation is an upper bound on the gap to the optimal price
 
-                    sliced_food_df = food_df.iloc[number_vec]
+        _, relaxation_price = IntegerSolver(
+            nutrient_matrix=nutrient_matrix,
+            price_vec=price_vec,
+            quantity_vec=quantity_vec,
+            lower_vec=lower_vec,
+            upper_vec=upper_vec
+        ).solve_relaxation(np.zeros(price_vec.size), quantity_vec.astype(np.float64))
 
-                    calories_vec = sliced_food_df["calories"].values
-                    proteins_vec = sliced_food_df["proteins"].values
-                    fats_vec = sliced_food_df["fats"].values
-                    carbo_vec = sliced_food_df["carbo"].values
-                    price_vec = sliced_food_df["price"].values
-                    quantity_vec = sliced_food_df["quantity"].astype(int).values
+        self.relaxation_price = relaxation_price
 
-                    cur_price = 0
+        if (min_price < self.start_min_price) and (relaxation_price is not None):
 
-                    min_quantity_vec = np.zeros_like(quantity_vec)
+            min_possible_price = relaxation_price
 
-                    rest_quantity_vec = quantity_vec.copy()
+            if np.all(price_vec == np.round(price_vec)):
+                min_possible_price = np.ceil(relaxation_price - self.EPS)  # prices of sets are integer too
 
-                    cur_min_quantity_vec, cur_min_price = self.__optimize(
-                        0,
-                        calories_vec,
-                        proteins_vec,
-                        fats_vec,
-                        carbo_vec,
-                        price_vec,
-                        quantity_vec,
-                        self.calories_lower,
-                        self.calories_upper,
-                        self.proteins_lower,
-                        self.proteins_upper,
-                        self.fats_lower,
-                        self.fats_upper,
-                        self.carbo_lower,
-                        self.carbo_upper,
-                        rest_quantity_vec,
-                        cur_price,
-                        min_quantity_vec,
-                        self.start_min_price
-                    )
+            min_possible_price = max(min_possible_price, self.EPS)
 
-                    cur_min_index = sliced_food_df[cur_min_quantity_vec > 0].index
+            self.telegram_handler.log_info(
+                f"Heuristic solver made {heuristic_solver.n_moves} moves in {heuristic_solver.n_rounds} rounds "
+                f"over {price_vec.size} dishes, the set costs at most "
+                f"{(min_price - min_possible_price) / min_possible_price:.1%} more than the optimal one "
+                f"(an upper bound on the gap from the linear relaxation, the gap itself may be smaller)"
+            )
 
-                    cur_min_quantity_vec = cur_min_quantity_vec[cur_min_quantity_vec > 0]
+        return min_quantity_vec, min_price
 
-                    cur_min_dict = pd.Series(cur_min_quantity_vec, index=cur_min_index).to_dict()
+    def __get_front_restriction_dict(self) -> dict:
 
-                    n_attempts += 1
+        # restrictions of one front, proteins_lower and calories_upper are its grid
 
-                    if n_attempts >= self.MAX_ATTEMPTS:
-                        self.telegram_handler.log_info(
-                            'It is impossible to assemble a daily '
-                            'food out of the rest products!'
-                        )
+        return {
+            "calories_lower": self.calories_lower,
+            "proteins_upper": self.proteins_upper,
+            "fats_lower": self.fats_lower,
+            "fats_upper": self.fats_upper,
+            "carbo_lower": self.carbo_lower,
+            "carbo_upper": self.carbo_upper,
+            "start_min_price": self.start_min_price,
+        }
 
-                        break
+    def __launch_pareto_search(self, sliced_catalog: Catalog) -> tuple:
 
-                if n_attempts >= self.MAX_ATTEMPTS:
-                    break
+        # the set is looked up in the stored front of this catalog, and a new front around the current bounds
+        # is built if there is none or it cannot answer for the current bounds
 
-                self.min_dict_list = [cur_min_dict, ]
+        self.engine = "pareto_front"
 
-                self.__print_optimal_set_info(i_day, food_df)
+        restriction_dict = self.__get_front_restriction_dict()
 
-                cur_button_list = ["yes", "no"]
+        # fronts are stored by the hash of the frame, it is built only if they are stored
 
-                answer = self.telegram_handler.ask_for_input("Do you like your set?", cur_button_list)
+        food_df = None if self.pareto_front is None else sliced_catalog.get_food_df()
 
-                while True:
+        front = None if self.pareto_front is None else self.pareto_front.get_front(food_df, restriction_dict)
 
-                    if answer == "yes":
+        answer = None if front is None else ParetoFront.lookup(front, self.proteins_lower, self.calories_upper)
 
-                        is_optimized = True
+        if answer is not None:
 
-                        break
+            self.n_nodes = 0
 
-                    if answer == "no":
+            self.telegram_handler.log_info("The set is taken from the Pareto front of this catalog without search")
 
-                        break
+        else:
 
-                    answer = self.telegram_handler.ask_for_input("Try again!", cur_button_list)
+            self.engine = "pareto_search"
 
-            if n_attempts >= self.MAX_ATTEMPTS:
-                break
+            front = self.__build_pareto_front(sliced_catalog)
 
-            self.telegram_handler.log_info(f"Optimization finished for day {i_day + 1}!")
+            if self.pareto_front is not None:
+                self.pareto_front.set_front(food_df, restriction_dict, front)
 
-            min_dict_list.append(cur_min_dict)
-            min_price_list.append(cur_min_price)
+            answer = ParetoFront.lookup(front, self.proteins_lower, self.calories_upper)
 
-            food_df = food_df.drop(cur_min_dict.keys())
+        min_dict, is_optimal = answer
 
-            self.telegram_handler.log_info(
-                f"Time elapsed on day {i_day + 1}: {time.time() - start_time: .2f} sec"
-            )
+        if not is_optimal:
+            self.telegram_handler.log_info("Node limit or time budget is reached, so the set may be not optimal")
 
-        food_df = food_copy_df
-        
-        self.min_dict_list = min_dict_list
+        if min_dict is None:
+            return np.zeros(sliced_catalog.size, dtype=int), self.start_min_price
 
-        food_dict = self.__print_optimal_set_info(0, food_df)
+        min_quantity_vec = np.array([min_dict.get(name, 0) for name in sliced_catalog.get_names()], dtype=int)
 
-        return food_dict
+        return min_quantity_vec, sliced_catalog.record_array["price"] @ min_quantity_vec
+
+    def __build_pareto_front(self, sliced_catalog: Catalog) -> dict:
+
+        # points go from easier bounds to harder ones: proteins_lower grows by rows and calories_upper falls
+        # by columns, so both easier neighbours of a point are solved before it; a known set which fits the point
+        # and costs as much as the optimal set of a neighbour is optimal there too, and the search is skipped
+
+        start_time = time.time()
+
+        names = sliced_catalog.get_names()
+
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        proteins_lower_list, calories_upper_list = ParetoFront.get_grid_lists(self.proteins_lower, self.calories_upper)
+
+        n_rows = len(proteins_lower_list)
+        n_columns = len(calories_upper_list)
+
+        set_list = []  # as (quantity vector, price, nutrient vector)
+
+        point_matrix = [[None] * n_columns for _ in range(n_rows)]  # as (position in set_list or None, is_optimal)
+
+        n_searches = 0
+
+        self.n_nodes = 0
+
+        for i_row in range(n_rows):
+
+            for i_column in reversed(range(n_columns)):
+
+                cur_lower_vec = lower_vec.copy()
+                cur_lower_vec[1] = proteins_lower_list[i_row]
+
+                cur_upper_vec = upper_vec.copy()
+                cur_upper_vec[0] = calories_upper_list[i_column]
+
+                # the current bounds get the same search as in the exact mode
+
+                is_current_point = (i_row == ParetoFront.N_STEPS) and (i_column == ParetoFront.N_STEPS)
+
+                neighbour_list = []
+
+                if i_row > 0:
+                    neighbour_list.append(point_matrix[i_row - 1][i_column])
+
+                if i_column < n_columns - 1:
+                    neighbour_list.append(point_matrix[i_row][i_column + 1])
+
+                optimal_set_list = [i_set for i_set, is_optimal in neighbour_list if is_optimal]
+
+                # there is no set cheaper than start_min_price for easier bounds, so there is none here
+
+                if (None in optimal_set_list) or np.any(cur_lower_vec > cur_upper_vec):
+
+                    point_matrix[i_row][i_column] = (None, True)
+
+                    continue
+
+                min_possible_price = max([set_list[i_set][1] for i_set in optimal_set_list], default=0)
+
+                fitting_set_list = [
+                    i_set
+                    for i_set, (_, _, nutrient_vec) in enumerate(set_list)
+                    if np.all(nutrient_vec >= cur_lower_vec - self.EPS) and
+                    np.all(nutrient_vec <= cur_upper_vec + self.EPS)
+                ]
+
+                i_min_set = min(fitting_set_list, key=lambda i_set: set_list[i_set][1], default=None)
+
+                if (i_min_set is not None) and (set_list[i_min_set][1] <= min_possible_price + self.EPS):
+
+                    point_matrix[i_row][i_column] = (i_min_set, True)
+
+                    continue
+
+                integer_solver = IntegerSolver(
+                    nutrient_matrix=nutrient_matrix,
+                    price_vec=price_vec,
+                    quantity_vec=quantity_vec,
+                    lower_vec=cur_lower_vec,
+                    upper_vec=cur_upper_vec,
+                    max_nodes=IntegerSolver.MAX_NODES if is_current_point else self.PARETO_MAX_NODES,
+                    deadline=self.deadline,
+                    progress_callback=self.__get_progress_callback()
+                )
+
+                min_quantity_vec, min_price = integer_solver.solve(
+                    self.start_min_price,
+                    None if i_min_set is None else set_list[i_min_set][0]
+                )
+
+                n_searches += 1
+
+                self.n_nodes += integer_solver.n_nodes
+
+                if min_price == self.start_min_price:
+
+                    point_matrix[i_row][i_column] = (None, integer_solver.is_optimal)
+
+                    continue
+
+                if (i_min_set is None) or np.any(set_list[i_min_set][0] != min_quantity_vec):
+
+                    i_min_set = len(set_list)
+
+                    set_list.append((min_quantity_vec, min_price, nutrient_matrix.T @ min_quantity_vec))
+
+                point_matrix[i_row][i_column] = (i_min_set, integer_solver.is_optimal)
+
+        self.telegram_handler.log_info(
+            f"Pareto front of {n_rows * n_columns} points over {sliced_catalog.size} dishes is built "
+            f"with {n_searches} searches and {len(set_list)} distinct sets in {time.time() - start_time:.2f} sec"
+        )
+
+        return ParetoFront.create_front(
+            proteins_lower_list=proteins_lower_list,
+            calories_upper_list=calories_upper_list,
+            set_list=[
+                (
+                    [(name, quantity) for name, quantity in zip(names, min_quantity_vec.tolist()) if quantity > 0],
+                    price,
+                    nutrient_vec[1],
+                    nutrient_vec[0],
+                )
+                for min_quantity_vec, price, nutrient_vec in set_list
+            ],
+            point_matrix=point_matrix
+        )
+
+    def __launch_bounded_search(self, sliced_catalog: Catalog) -> tuple:
+
+        nutrient_matrix = sliced_catalog.get_matrix(self.NUTRIENT_COLUMNS)
+        price_vec = sliced_catalog.record_array["price"]
+        quantity_vec = sliced_catalog.record_array["quantity"].astype(int)
+
+        lower_vec, upper_vec = self.__get_bound_vecs()
+
+        # dishes covering the biggest share of lower bounds per ruble go first,
+        # so that a cheap set is found early and prunes the rest of the tree
+
+        coverage_vec = (nutrient_matrix / np.maximum(lower_vec, 1)).sum(axis=1)
+
+        with np.errstate(divide="ignore"):
+            order_vec = np.argsort(price_vec / coverage_vec, kind="stable")
+
+        nutrient_matrix = nutrient_matrix[order_vec]
+        price_vec = price_vec[order_vec]
+        quantity_vec = quantity_vec[order_vec]
+
+        coverage_curve_list = self.__build_coverage_curves(nutrient_matrix, price_vec, quantity_vec)
+
+        search_progress = self.__create_search_progress(self.BOUNDED_CHECK_INTERVAL)
+
+        min_quantity_list, min_price = self.__optimize_bounded(
+            0,
+            nutrient_matrix.tolist(),
+            price_vec.tolist(),
+            quantity_vec.tolist(),
+            lower_vec.tolist(),
+            upper_vec.tolist(),
+            coverage_curve_list,
+            [0] * price_vec.size,
+            0,
+            None,
+            self.start_min_price,
+            search_progress
+        )
+
+        self.n_nodes = None if search_progress is None else search_progress.n_nodes
+
+        if self.__is_time_over():
+            self.telegram_handler.log_info("Time budget is over, so the set may be not optimal")
+
+        result_quantity_vec = np.zeros_like(quantity_vec)
+
+        if min_quantity_list is not None:
+            result_quantity_vec[order_vec] = min_quantity_list
+
+        return result_quantity_vec, min_price
+
+    @staticmethod
+    def __build_coverage_curves(
+        nutrient_matrix: np.ndarray,
+        price_vec: np.ndarray,
+        quantity_vec: np.ndarray
+    ) -> list:
+
+        # for every suffix of dishes and every nutrient there is a curve of the maximum amount of this nutrient
+        # achievable with a given budget of rubles (resource 0) or of another nutrient (resources 1-4);
+        # dishes are taken fractionally in the order of decreasing ratio, so the curve never underestimates
+
+        resource_matrix = np.column_stack([price_vec, nutrient_matrix])
+
+        coverage_curve_list = []
+
+        for i_dish in range(price_vec.size + 1):
+
+            suffix_curve_list = []
+
+            for i_nutrient in range(nutrient_matrix.shape[1]):
+
+                value_vec = nutrient_matrix[i_dish:, i_nutrient]
+
+                is_useful_vec = value_vec > 0
+
+                value_vec = value_vec[is_useful_vec]
+                cur_quantity_vec = quantity_vec[i_dish:][is_useful_vec]
+
+                nutrient_curve_list = []
+
+                for i_resource in range(resource_matrix.shape[1]):
+
+                    if i_resource == i_nutrient + 1:
+
+                        nutrient_curve_list.append(None)
+
+                        continue
+
+                    cost_vec = resource_matrix[i_dish:, i_resource][is_useful_vec]
+
+                    with np.errstate(divide="ignore"):
+                        ratio_vec = value_vec / cost_vec
+
+                    order_vec = np.argsort(-ratio_vec, kind="stable")
+
+                    nutrient_curve_list.append((
+                        [0.] + np.cumsum((cost_vec * cur_quantity_vec)[order_vec]).tolist(),
+                        [0.] + np.cumsum((value_vec * cur_quantity_vec)[order_vec]).tolist(),
+                        ratio_vec[order_vec].tolist()
+                    ))
+
+                suffix_curve_list.append(nutrient_curve_list)
+
+            coverage_curve_list.append(suffix_curve_list)
+
+        return coverage_curve_list
+
+    @staticmethod
+    def __get_max_coverage(coverage_curve, budget):
+
+        cum_cost_list, cum_value_list, ratio_list = coverage_curve
+
+        i_point = bisect_right(cum_cost_list, budget)
+
+        if i_point == len(cum_cost_list):
+            return cum_value_list[-1]
+
+        return cum_value_list[i_point - 1] + (budget - cum_cost_list[i_point - 1]) * ratio_list[i_point - 1]
+
+    # the same as __optimize, but it chooses the number of units of each dish at once
+    # and cuts branches which cannot cover the lower bounds within the rest of price and upper bounds
+    @staticmethod
+    def __optimize_bounded(
+        i_dish,
+        nutrient_list,
+        price_list,
+        quantity_list,
+        lower_list,
+        upper_list,
+        coverage_curve_list,
+        cur_quantity_list,
+        cur_price,
+        min_quantity_list,
+        min_price,
+        search_progress,
+    ):
+
+        if (lower_list[0] <= 0) and \
+           (lower_list[1] <= 0) and \
+           (lower_list[2] <= 0) and \
+           (lower_list[3] <= 0):
+
+            return cur_quantity_list.copy(), cur_price
+
+        elif i_dish == len(price_list):
+
+            return min_quantity_list, min_price
+
+        elif (search_progress is not None) and search_progress.is_over(min_price):
+
+            # the rest of the tree is skipped, the best set found by now is returned
+
+            return min_quantity_list, min_price
+
+        budget_list = [min_price - cur_price] + upper_list
+
+        for i_nutrient in range(4):
+
+            if lower_list[i_nutrient] <= 0:
+                continue
+
+            for i_resource, coverage_curve in enumerate(coverage_curve_list[i_dish][i_nutrient]):
+
+                if coverage_curve is None:
+                    continue
+
+                max_coverage = Optimizer.__get_max_coverage(coverage_curve, budget_list[i_resource])
+
+                if max_coverage < lower_list[i_nutrient] - Optimizer.EPS:
+                    return min_quantity_list, min_price
+
+        nutrient_vec = nutrient_list[i_dish]
+        cur_dish_price = price_list[i_dish]
+
+        max_units = quantity_list[i_dish]
+
+        for i_nutrient in range(4):
+
+            if nutrient_vec[i_nutrient] > 0:
+                max_units = min(max_units, int(upper_list[i_nutrient] // nutrient_vec[i_nutrient]))
+
+        for n_units in range(max_units, -1, -1):
+
+            new_cur_price = cur_price + n_units * cur_dish_price
+
+            if (n_units > 0) and (new_cur_price >= min_price):
+                continue
+
+            cur_quantity_list[i_dish] = n_units
+
+            min_quantity_list, min_price = Optimizer.__optimize_bounded(
+                i_dish + 1,
+                nutrient_list,
+                price_list,
+                quantity_list,
+                [lower_list[i] - n_units * nutrient_vec[i] for i in range(4)],
+                [upper_list[i] - n_units * nutrient_vec[i] for i in range(4)],
+                coverage_curve_list,
+                cur_quantity_list,
+                new_cur_price,
+                min_quantity_list,
+                min_price,
+                search_progress,
+            )
+
+        cur_quantity_list[i_dish] = 0
+
+        return min_quantity_list, min_price
 
     # this is my favorite function and I did not use types on purpose because I believe that it would slow down it
     @staticmethod
@@ -213,6 +1827,8 @@ class Optimizer:
         cur_price,
         min_quantity_vec,
         min_price,
+        transposition_table,
+        search_progress,
     ):
 
         assert calories_upper >= 0
@@ -233,8 +1849,35 @@ class Optimizer:
 
             return min_quantity_vec, min_price
 
+        elif (search_progress is not None) and search_progress.is_over(min_price):
+
+            return min_quantity_vec, min_price
+
         assert rest_quantity_vec[i_first_dish] > 0
 
+        if transposition_table is not None:
+
+            # satisfied lower bounds are the same whatever negative they are
+
+            lower_tuple = (max(calories_lower, 0), max(proteins_lower, 0), max(fats_lower, 0), max(carbo_lower, 0))
+            upper_tuple = (calories_upper, proteins_upper, fats_upper, carbo_upper)
+
+            key = transposition_table.get_key(i_first_dish, int(rest_quantity_vec[i_first_dish]), lower_tuple)
+
+            entry = transposition_table.get_entry(key, lower_tuple, upper_tuple)
+
+            if (entry is not None) and (cur_price + entry[0] >= min_price):
+
+                transposition_table.n_cutoffs += 1
+                transposition_table.n_saved_nodes += entry[1]
+
+                return min_quantity_vec, min_price
+
+            transposition_table.n_nodes += 1
+
+            n_start_nodes = transposition_table.n_nodes
+            n_start_upper_rejections = transposition_table.n_upper_rejections
+
         cur_calories = calories_vec[i_first_dish]
         cur_proteins = proteins_vec[i_first_dish]
         cur_fats = fats_vec[i_first_dish]
@@ -282,8 +1925,14 @@ class Optimizer:
                     new_cur_price,
                     min_quantity_vec,
                     min_price,
+                    transposition_table,
+                    search_progress,
                 )
 
+        elif transposition_table is not None:
+
+            transposition_table.n_upper_rejections += 1
+
         new_cur_price = cur_price
 
         if first_dish_modified:
@@ -296,7 +1945,7 @@ class Optimizer:
 
         i_first_dish += 1
 
-        return Optimizer.__optimize(
+        min_quantity_vec, min_price = Optimizer.__optimize(
             i_first_dish,
             calories_vec,
             proteins_vec,
@@ -316,43 +1965,40 @@ class Optimizer:
             new_cur_price,
             min_quantity_vec,
             min_price,
+            transposition_table,
+            search_progress,
         )
 
-    def __calculate_nutritional_value(self, food_dict: dict) -> tuple:
+        # if the whole subtree is explored (the budget is not over), no rest of the set is cheaper
+        # than the found one or the budget
+
+        if (transposition_table is not None) and ((search_progress is None) or (not search_progress.is_time_over)):
+            transposition_table.set_entry(
+                key,
+                lower_tuple,
+                upper_tuple,
+                min_price - cur_price,
+                transposition_table.n_nodes - n_start_nodes + 1,
+                transposition_table.n_upper_rejections == n_start_upper_rejections
+            )
 
-        cur_calories_list = []
-        cur_proteins_list = []
-        cur_fats_list = []
-        cur_carbo_list = []
-        cur_price_list = []
+        return min_quantity_vec, min_price
 
-        for i_day in range(len(self.min_dict_list)):
+    def __calculate_nutritional_value(self, set_food_df: pd.DataFrame) -> tuple:
 
-            cur_calories_list.append(0)
-            cur_proteins_list.append(0)
-            cur_fats_list.append(0)
-            cur_carbo_list.append(0)
-            cur_price_list.append(0)
+        # rows of the quantity matrix are days and columns are dishes of the sets (not of the whole catalog),
+        # so totals of all days are one product with the matrix of nutrients and prices
 
-            min_dict = self.min_dict_list[i_day]
+        value_matrix = set_food_df[self.SUMMARY_COLUMNS].values.astype(np.float64)
 
-            for key in min_dict:
-                cur_quantity = min_dict[key]
+        quantity_matrix = np.zeros((len(self.min_dict_list), set_food_df.index.size))
 
-                cur_calories_list[-1] += food_dict[key]["calories"] * cur_quantity
-                cur_proteins_list[-1] += food_dict[key]["proteins"] * cur_quantity
-                cur_fats_list[-1] += food_dict[key]["fats"] * cur_quantity
-                cur_carbo_list[-1] += food_dict[key]["carbo"] * cur_quantity
+        for i_day, min_dict in enumerate(self.min_dict_list):
+            quantity_matrix[i_day, set_food_df.index.get_indexer(list(min_dict.keys()))] = list(min_dict.values())
 
-                cur_price_list[-1] += food_dict[key]["price"] * cur_quantity
+        total_matrix = quantity_matrix @ value_matrix
 
-        return (
-            cur_calories_list,
-            cur_proteins_list,
-            cur_fats_list,
-            cur_carbo_list,
-            cur_price_list
-        )
+        return tuple(total_matrix.T.tolist())
 
     def __print_optimal_set_info(
         self,
@@ -360,7 +2006,13 @@ class Optimizer:
         food_df: pd.DataFrame,
     ) ->  dict:
 
-        food_dict = food_df.to_dict('index')
+        # only dishes of the sets are turned into dicts, they are shown and then added to the cart
+
+        name_list = list(dict.fromkeys(name for min_dict in self.min_dict_list for name in min_dict))
+
+        set_food_df = food_df.loc[name_list]
+
+        food_dict = set_food_df.to_dict('index')
 
         (
             cur_calories_list,
@@ -368,7 +2020,7 @@ class Optimizer:
             cur_fats_list,
             cur_carbo_list,
             cur_price_list
-        ) = self.__calculate_nutritional_value(food_dict)
+        ) = self.__calculate_nutritional_value(set_food_df)
 
         for i_day in range(len(cur_price_list)):
 
@@ -414,4 +2066,38 @@ class Optimizer:
 
             self.telegram_handler.log_info("\n\n".join(print_list))
 
+        if len(cur_price_list) > 1:
+            self.telegram_handler.log_info(
+                f"Total price for {len(cur_price_list)} days: {int(sum(cur_price_list))} rubles"
+            )
+
         return food_dict
+
+
+# state of a worker process of the parallel mode: the catalog and an optimizer without telegram
+
+_worker_catalog = None
+_worker_optimizer = None
+
+
+def _initialize_worker(catalog: Catalog, worker_params: dict):
+
+    global _worker_catalog, _worker_optimizer
+
+    _worker_catalog = catalog
+
+    _worker_optimizer = Optimizer(
+        telegram_handler=TelegramHandler(chat_id=os.getpid(), use_telegram=False),
+        **worker_params
+    )
+
+
+def _solve_subset_in_worker(position_vec: np.ndarray, deadline: float) -> tuple:
+
+    start_time = time.time()
+
+    _worker_optimizer.deadline = deadline
+
+    quantity_vec, price = _worker_optimizer.solve_subset(_worker_catalog.select(position_vec))
+
+    return quantity_vec, price, os.getpid(), time.time() - start_time
@@ -0,0 +1,172 @@
+import json
+import argparse
+
+from pathlib import Path
+
+import numpy as np
+
+from catalog import Catalog
+from optimizer import Optimizer
+
+
+SOLVER_MODE = "exact"
+
+RESTRICTION_KEYS = [
+    "calories_lower",
+    "calories_upper",
+    "proteins_lower",
+    "proteins_upper",
+    "fats_lower",
+    "fats_upper",
+    "carbo_lower",
+    "carbo_upper",
+    "max_mass",
+    "start_min_price",
+]
+
+
+class SilentTelegramHandler:
+
+    # the optimizer runs without the bot: messages are dropped and every set is accepted
+
+    def log_info(self, message):
+        pass
+
+    def ask_for_input(self, message, button_list):
+        return "yes"
+
+
+def optimize(
+    catalog: Catalog,
+    food_restrictions: dict,
+    n_days: int,
+    solver_mode: str = SOLVER_MODE,
+    seed: int = None,
+    time_budget: float = None,
+) -> dict:
+
+    # sets of dishes for n_days from the catalog within food_restrictions (shaped like "food_restrictions"
+    # of config/config.json); the result is ready for json.dump, "is_found" is false if some day has no set
+
+    missing_key_list = [key for key in RESTRICTION_KEYS if key not in food_restrictions]
+
+    if missing_key_list:
+        raise ValueError(f"Food restrictions have no {missing_key_list}!")
+
+    optimizer = Optimizer(
+        telegram_handler=SilentTelegramHandler(),
+        n_days=n_days,
+        calories_lower=food_restrictions["calories_lower"],
+        calories_upper=food_restrictions["calories_upper"],
+        proteins_lower=food_restrictions["proteins_lower"],
+        proteins_upper=food_restrictions["proteins_upper"],
+        fats_lower=food_restrictions["fats_lower"],
+        fats_upper=food_restrictions["fats_upper"],
+        carbo_lower=food_restrictions["carbo_lower"],
+        carbo_upper=food_restrictions["carbo_upper"],
+        start_min_price=food_restrictions["start_min_price"],
+        solver_mode=solver_mode,
+        sample_subsets=False,
+        sampling="stratified",
+        seed=seed,
+        n_workers=1,
+        n_solutions=1,
+        time_budget=time_budget,
+        solution_cache=None,
+        pareto_front=None,
+        plan_store=None
+    )
+
+    catalog = optimizer.remove_dominated_dishes(catalog.limit_mass(food_restrictions["max_mass"]))
+
+    optimizer.launch_optimizer(catalog)
+
+    food_df = catalog.get_food_df()
+
+    link_dict = catalog.get_link_dict([name for min_dict in optimizer.min_dict_list for name in min_dict])
+
+    day_list = []
+
+    for min_dict in optimizer.min_dict_list:
+
+        name_list = list(min_dict.keys())
+
+        quantity_vec = np.array(list(min_dict.values()), dtype=np.float64)
+
+        total_vec = quantity_vec @ food_df.loc[name_list, Optimizer.SUMMARY_COLUMNS].values
+
+        day_list.append({
+            **{column: float(total) for column, total in zip(Optimizer.SUMMARY_COLUMNS, total_vec)},
+            "dishes": [
+                {
+                    "name": name,
+                    "quantity": int(quantity),
+                    "price": float(food_df.at[name, "price"]),
+                    "link": link_dict[name],
+                }
+                for name, quantity in min_dict.items()
+            ],
+        })
+
+    return {
+        "food_restrictions": food_restrictions,
+        "n_days": n_days,
+        "solver_mode": solver_mode,
+        "is_found": len(day_list) == n_days,
+        "days": day_list,
+    }
+
+
+def load_restriction_dict(path: Path) -> dict:
+
+    # restriction profiles by names: one "food_restrictions" object, an object of them by names
+    # or the whole config/config.json (then names are chat ids)
+
+    restriction_dict = json.load(path.open(encoding="utf-8"))
+
+    if "calories_lower" in restriction_dict:
+        return {path.stem: restriction_dict}
+
+    return {
+        name: profile.get("food_restrictions", profile)
+        for name, profile in restriction_dict.items()
+    }
+
+
+if __name__ == "__main__":
+
+    # solves every restriction profile over one catalog loaded once, for example
+    # python optimizer_api.py --catalog ../output/138619108_catalog.csv --restrictions ../config/config.json
+
+    global_argument_parser = argparse.ArgumentParser(description="Optimal sets of dishes for restriction profiles")
+
+    global_argument_parser.add_argument("--catalog", type=Path, required=True, help="catalog CSV or Parquet")
+    global_argument_parser.add_argument("--restrictions", type=Path, required=True, help="restrictions JSON")
+    global_argument_parser.add_argument("--output", type=Path, default=None, help="JSON file, stdout by default")
+    global_argument_parser.add_argument("--n-days", type=int, default=1)
+    global_argument_parser.add_argument("--solver-mode", choices=Optimizer.SOLVER_MODES, default=SOLVER_MODE)
+    global_argument_parser.add_argument("--seed", type=int, default=None)
+    global_argument_parser.add_argument("--time-budget", type=float, default=None, help="seconds per day")
+
+    global_args = global_argument_parser.parse_args()
+
+    global_catalog = Catalog.read(global_args.catalog)
+
+    global_result_dict = {
+        global_name: optimize(
+            catalog=global_catalog,
+            food_restrictions=global_food_restrictions,
+            n_days=global_args.n_days,
+            solver_mode=global_args.solver_mode,
+            seed=global_args.seed,
+            time_budget=global_args.time_budget
+        )
+        for global_name, global_food_restrictions in load_restriction_dict(global_args.restrictions).items()
+    }
+
+    global_text = json.dumps(global_result_dict, indent=4, ensure_ascii=False)
+
+    if global_args.output is None:
+        print(global_text)
+    else:
+        global_args.output.write_text(global_text, encoding="utf-8")
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from solution_cache import SolutionCache
+
+
+class ParetoFront:
+
+    # cheapest sets over a grid of proteins_lower and calories_upper for one catalog and the other restrictions:
+    # a set optimal for easier bounds is optimal for harder ones too if it still fits them, so the grid is
+    # answered by few searches, and later changes of these two bounds within the grid need no search at all;
+    # fronts are stored in a JSON file next to the catalog of the user, the least recently used ones are evicted
+
+    MAX_SIZE = 20
+
+    PROTEINS_STEP = 10  # grams
+    CALORIES_STEP = 50  # kcal
+    N_STEPS = 4  # steps of the grid on both sides of the current bounds
+
+    EPS = 1e-6
+
+    FILE_LOCK = threading.Lock()
+
+    def __init__(self, path: Path):
+
+        self.path = path
+
+    @staticmethod
+    def get_grid_lists(proteins_lower, calories_upper) -> tuple:
+
+        step_vec = np.arange(-ParetoFront.N_STEPS, ParetoFront.N_STEPS + 1)
+
+        return (
+            [proteins_lower + ParetoFront.PROTEINS_STEP * step for step in step_vec.tolist()],
+            [calories_upper + ParetoFront.CALORIES_STEP * step for step in step_vec.tolist()],
+        )
+
+    def get_front(self, food_df: pd.DataFrame, restriction_dict: dict):
+
+        # restriction_dict has all restrictions except proteins_lower and calories_upper
+
+        key = SolutionCache.get_key(food_df, restriction_dict)
+
+        with self.FILE_LOCK:
+
+            front_dict = self.__load_front_dict()
+
+            front = front_dict.get(key)
+
+            if front is not None:
+
+                front["last_used"] = time.time()
+
+                self.__save_front_dict(front_dict)
+
+        return front
+
+    def set_front(self, food_df: pd.DataFrame, restriction_dict: dict, front: dict):
+
+        key = SolutionCache.get_key(food_df, restriction_dict)
+
+        with self.FILE_LOCK:
+
+            front_dict = self.__load_front_dict()
+
+            front["last_used"] = time.time()
+
+            front_dict[key] = front
+
+            key_list = sorted(front_dict, key=lambda cur_key: front_dict[cur_key]["last_used"])
+
+            for cur_key in key_list[:-self.MAX_SIZE]:
+                del front_dict[cur_key]
+
+            self.__save_front_dict(front_dict)
+
+    @staticmethod
+    def create_front(
+        proteins_lower_list: list,
+        calories_upper_list: list,
+        set_list: list,
+        point_matrix: list,
+    ) -> dict:
+
+        # set_list has sets as (pair list of names and quantities, price, proteins, calories),
+        # point_matrix has (position in set_list or None, is_optimal) for proteins by rows and calories by columns
+
+        return {
+            "proteins_lower_list": proteins_lower_list,
+            "calories_upper_list": calories_upper_list,
+            "set_list": [
+                {
+                    "pair_list": [[name, int(quantity)] for name, quantity in pair_list],
+                    "price": float(price),
+                    "proteins": float(proteins),
+                    "calories": float(calories),
+                }
+                for pair_list, price, proteins, calories in set_list
+            ],
+            "point_matrix": [[[i_set, bool(is_optimal)] for i_set, is_optimal in row] for row in point_matrix],
+        }
+
+    @staticmethod
+    def lookup(front: dict, proteins_lower, calories_upper):
+
+        # returns (quantity dict or None if there is no set, is_optimal) or None if the front cannot answer;
+        # between points of the grid the answer is the cheapest stored set which fits the bounds,
+        # and it is given only if it costs as much as the optimal set of the nearest easier point
+
+        proteins_lower_list = front["proteins_lower_list"]
+        calories_upper_list = front["calories_upper_list"]
+
+        if not (proteins_lower_list[0] <= proteins_lower <= proteins_lower_list[-1]) or \
+           not (calories_upper_list[0] <= calories_upper <= calories_upper_list[-1]):
+            return None
+
+        i_row = int(np.searchsorted(proteins_lower_list, proteins_lower, side="right")) - 1
+        i_column = int(np.searchsorted(calories_upper_list, calories_upper, side="left"))
+
+        i_set, is_optimal = front["point_matrix"][i_row][i_column]
+
+        is_grid_point = (proteins_lower_list[i_row] == proteins_lower) and \
+                        (calories_upper_list[i_column] == calories_upper)
+
+        if is_grid_point:
+            return (None if i_set is None else dict(front["set_list"][i_set]["pair_list"])), is_optimal
+
+        if not is_optimal:
+            return None
+
+        # there is no set at the easier point, so there is none at the harder one
+
+        if i_set is None:
+            return None, True
+
+        fitting_set_list = [
+            cur_set
+            for cur_set in front["set_list"]
+            if (cur_set["proteins"] >= proteins_lower - ParetoFront.EPS) and
+               (cur_set["calories"] <= calories_upper + ParetoFront.EPS)
+        ]
+
+        if not fitting_set_list:
+            return None
+
+        min_set = min(fitting_set_list, key=lambda cur_set: cur_set["price"])
+
+        if min_set["price"] > front["set_list"][i_set]["price"] + ParetoFront.EPS:
+            return None
+
+        return dict(min_set["pair_list"]), True
+
+    def __load_front_dict(self) -> dict:
+
+        if not self.path.exists():
+            return {}
+
+        return json.load(self.path.open(encoding="utf-8"))
+
+    def __save_front_dict(self, front_dict: dict):
+
+        json.dump(front_dict, self.path.open("w", encoding="utf-8"), indent=4, ensure_ascii=False)
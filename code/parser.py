@@ -1,11 +1,15 @@
-import re
+import os
+import json
 import time
+import queue
+
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
 
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional
 
 from selenium.webdriver.chrome.service import Service
 from selenium import webdriver
@@ -18,6 +22,10 @@ from selenium.common.exceptions import ElementNotInteractableException
 
 from webdriver_manager.chrome import ChromeDriverManager
 
+from catalog import Catalog
+from catalog_crawler import CatalogCrawler
+from product_page import NUTRITION_TITLE, HttpFetcher, convert_to_grams, extract_npq_records, \
+    extract_nutritional_info, extract_product_card, extract_quantity
 from utils import get_input_option
 
 
@@ -27,6 +35,48 @@ class Parser:
     WAIT_TIMEOUT = 10
     SLEEP_AFTER_WAIT = 2
 
+    BROWSER_MEMORY_MB = 1024  # memory budget of one browser of the pool, it bounds the number of browsers
+    MAX_PAGES_PER_DRIVER = 200  # browsers of the pool are restarted after it, so that their memory does not grow
+
+    DISHLIST_PATH = Path(Path(__file__).parent, "..", "data", "dishlist.xlsx")  # nutrition facts of parsed dishes
+    DISHLIST_COLUMNS = ["mass", "proteins", "fats", "carbohydrates", "calories", "link"]
+    N_STALE_PAGES = 30  # dishes refreshed by every incremental full parse, the longest unrefreshed ones first
+
+    # texts of all cards of a catalog page in one call of the browser: the first non-empty text
+    # of the rendered elements which Parser reads from a card one by one (innerText gives the text of hidden
+    # elements too, unlike Selenium), and the links of the card images to product pages
+
+    CARD_SCRIPT = """
+        const getText = (card, selector) => {
+            for (const elem of card.querySelectorAll(selector)) {
+                if (!elem.getClientRects().length) {
+                    continue;
+                }
+                const text = elem.innerText.trim();
+                if (text !== "") {
+                    return text;
+                }
+            }
+            return "";
+        };
+        const cardList = document.querySelectorAll(".Catalog__col.Catalog__col--main .ProductCard__content");
+        const imageList = document.querySelectorAll(".Catalog__col.Catalog__col--main .ProductCard__image");
+        return JSON.stringify({
+            card_list: Array.from(cardList, (card) => ({
+                name: getText(card, "a"),
+                price: getText(card, ".Price__value"),
+                rest_text: getText(card, "div[class*='ProductCard__Rest caption']"),
+                cart_text: getText(card, ".CartButton__inner"),
+            })),
+            link_list: Array.from(imageList, (image) => image.querySelector("a"))
+                .filter((elem) => elem !== null)
+                .map((elem) => elem.href),
+        });
+    """
+
+    FETCH_BACKENDS = ("selenium", "http")
+    N_HTTP_CONNECTIONS = 16  # keep-alive connections fetching product pages in parallel with the http backend
+
     def __init__(
         self,
         address,
@@ -37,7 +87,10 @@ class Parser:
         telegram_handler,
         max_mass,
         logon_before_parsing,
-        headless
+        headless,
+        n_drivers,
+        fetch_backend,
+        incremental_full_mode
     ):
 
         self.driver = None
@@ -60,6 +113,16 @@ class Parser:
         self.logon_before_parsing = logon_before_parsing
         self.headless = headless
 
+        self.n_drivers = n_drivers  # browsers visiting product pages in parallel in full mode
+        self.n_pages = 0  # product pages visited by the driver since its start
+
+        if fetch_backend not in self.FETCH_BACKENDS:
+            raise ValueError(f"Unknown fetch backend {fetch_backend}!")
+
+        self.fetch_backend = fetch_backend  # how product pages are fetched in full mode
+
+        self.incremental_full_mode = incremental_full_mode  # full mode fetches only new and stale product pages
+
     def __initialize_driver(self):
 
         # use selenium to parse data and load card
@@ -69,6 +132,10 @@ class Parser:
             service = Service(ChromeDriverManager().install())
             options = Options()
 
+            # the heap of JavaScript takes most of the memory of a page
+
+            options.add_argument(f'--js-flags=--max-old-space-size={self.BROWSER_MEMORY_MB // 2}')
+
             if self.headless:
 
                 options.add_argument('--headless=new')
@@ -250,18 +317,17 @@ class Parser:
 
         out = []
 
-        if not parse_npq_only:
+        if (not parse_npq_only) and (links is None) and self.incremental_full_mode:
 
-            if links is None:
+            out += self.__parse_incrementally()
 
-                links = self.__get_product_links(self.SECTION_LINK)
+        elif not parse_npq_only:
 
-            for link in links:
+            if links is None:
 
-                product_card = self.__get_product_card(link)
+                links = self.__get_product_links(self.SECTION_LINK)
 
-                if product_card:
-                    out.append(product_card)
+            out += self.__get_product_cards(links)
 
         else:
 
@@ -278,74 +344,375 @@ class Parser:
 
             return out
 
+    def __get_product_cards(self, links: set) -> list:
+
+        if self.fetch_backend == "http":
+            return self.__get_product_cards_by_http(links)
+
+        return self.__get_product_cards_by_browser(links)
+
+    def __parse_incrementally(self) -> list:
+
+        # prices and quantities of all dishes come from the catalog pages as in npq mode,
+        # and nutrition facts are fetched only for links which are not in the dishlist yet
+        # and for a few of the longest unrefreshed ones, then they are merged into the dishlist
+
+        out, links = self.__parse_section(self.SECTION_LINK)
+
+        dishlist_df = self.__read_dishlist()
+
+        parsed_at_series = dishlist_df.drop_duplicates(subset="link").set_index("link")["parsed_at"]
+
+        new_link_list = sorted(links - set(parsed_at_series.index))
+
+        stale_link_list = parsed_at_series.loc[parsed_at_series.index.isin(links)] \
+            .sort_values(na_position="first") \
+            .index[:self.N_STALE_PAGES] \
+            .tolist()
+
+        self.telegram_handler.log_info(
+            f"Parsing {len(new_link_list)} new and {len(stale_link_list)} stale of {len(links)} product pages"
+        )
+
+        product_card_list = self.__get_product_cards(set(new_link_list + stale_link_list))
+
+        if product_card_list:
+
+            card_df = pd.DataFrame(product_card_list).set_index("name")[self.DISHLIST_COLUMNS]
+
+            card_df = card_df.apply(
+                lambda column: column if column.name == "link" else pd.to_numeric(column, errors="coerce")
+            )
+
+            # a dish is replaced by its link, so a renamed dish does not stay under the old name
+
+            dishlist_df = pd.concat([
+                dishlist_df.loc[~dishlist_df["link"].isin(card_df["link"]), self.DISHLIST_COLUMNS],
+                card_df
+            ]).sort_index()
+
+            dishlist_df["parsed_at"] = parsed_at_series \
+                .reindex(dishlist_df["link"]) \
+                .mask(dishlist_df["link"].isin(card_df["link"]).values, pd.Timestamp.now().floor("s")) \
+                .values
+
+            dishlist_df.to_excel(self.DISHLIST_PATH)
+
+        return out
+
+    def __read_dishlist(self) -> pd.DataFrame:
+
+        if not self.DISHLIST_PATH.exists():
+
+            return pd.DataFrame(
+                columns=self.DISHLIST_COLUMNS + ["parsed_at"],
+                index=pd.Index([], name="name")
+            )
+
+        dishlist_df = pd.read_excel(self.DISHLIST_PATH, index_col="name")
+
+        # dishlists written before incremental parsing have no time of parsing, their dishes are refreshed first
+
+        if "parsed_at" not in dishlist_df.columns:
+            dishlist_df["parsed_at"] = pd.NaT
+
+        dishlist_df["parsed_at"] = pd.to_datetime(dishlist_df["parsed_at"])
+
+        return dishlist_df
+
     def __parse_npq_for_section(
         self,
         section_link: str
     ) -> list:
 
+        return self.__parse_section(section_link)[0]
+
+    def __parse_section(
+        self,
+        section_link: str
+    ) -> tuple:
+
+        # npq records and links of product pages of the section, both are taken in one pass over its pages
+
+        if self.fetch_backend == "http":
+
+            page_list = self.__crawl_section(section_link)
+
+            if page_list is not None:
+                return (
+                    extract_npq_records([raw_card for page in page_list for raw_card in page.get_raw_card_list()]),
+                    {product_link for page in page_list for product_link in page.link_list}
+                )
+
         self.driver.get(section_link)
 
-        out = []
+        raw_card_list = []
+        links = set()
 
         WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
             expected_conditions.presence_of_element_located((By.CLASS_NAME, "ProductCard__content"))
         )
 
-        name_set = set()
-
         while True:
 
             forward = self.driver.find_elements(By.LINK_TEXT, "Вперёд")
 
-            product_cards = self.driver.find_element(
-                By.CSS_SELECTOR, ".Catalog__col.Catalog__col--main"
-            ).find_elements(
-                By.CLASS_NAME,
-                "ProductCard__content"
+            # one round trip per page instead of several per field of every card,
+            # the texts are processed the same way as the texts of a crawled page
+
+            page_dict = json.loads(self.driver.execute_script(self.CARD_SCRIPT))
+
+            raw_card_list += page_dict["card_list"]
+
+            links.update(page_dict["link_list"])
+
+            if not forward:
+                return extract_npq_records(raw_card_list), links
+
+            self.driver.get(forward[0].get_attribute("href"))
+
+            WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
+                expected_conditions.presence_of_element_located(
+                    (By.CLASS_NAME, "ProductCard__content")
+                )
             )
 
-            driver_copy = self.driver
+    def __crawl_section(self, section_link: str) -> Optional[list]:
 
-            for product_card in product_cards:
+        # pages of the section over HTTP with the cookies of the browser session, None if some page failed
+        # or the cards are rendered by JavaScript, then the section is paginated by the browser
 
-                self.driver = product_card
+        fetcher = HttpFetcher(
+            cookie_list=self.driver.get_cookies(),
+            user_agent=self.driver.execute_script("return navigator.userAgent"),
+            pool_size=CatalogCrawler.N_CONNECTIONS
+        )
 
-                cur_name = self.__get_product_name(link=None, from_product_card=True)
+        try:
 
-                if cur_name in name_set:
-                    continue
+            page_list = CatalogCrawler(fetcher).crawl(section_link)
 
-                name_set.add(cur_name)
+        finally:
 
-                cur_price = self.__get_price()
-                cur_quantity = self.__get_quantity(from_product_card=True)
+            fetcher.close()
 
-                out.append(
-                    {
-                        'name': cur_name,
-                        'price': cur_price,
-                        'quantity': cur_quantity,
-                    }
-                )
+        if (page_list is None) or not any(page.raw_card_list for page in page_list):
 
-            self.driver = driver_copy
+            self.telegram_handler.log_info("Failed to crawl the catalog over HTTP, it is paginated by the browser")
 
-            if not forward:
-                return out
+            return None
 
-            self.driver.get(forward[0].get_attribute("href"))
+        self.telegram_handler.log_info(f"Crawled {len(page_list)} pages of the catalog over HTTP")
 
-            WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
-                expected_conditions.presence_of_element_located(
-                    (By.CLASS_NAME, "ProductCard__content")
-                )
+        return page_list
+
+    def __get_n_drivers(self) -> int:
+
+        # no more browsers than the available memory holds within their budgets
+
+        if ("SC_AVPHYS_PAGES" not in os.sysconf_names) or ("SC_PAGE_SIZE" not in os.sysconf_names):
+            return self.n_drivers
+
+        available_mb = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+        return max(1, min(self.n_drivers, available_mb // self.BROWSER_MEMORY_MB))
+
+    def __create_worker(self):
+
+        # a parser with its own browser at the same address and delivery interval, it never logs in
+
+        worker = Parser(
+            address=self.address,
+            phone_number=self.phone_number,
+            parse_npq_only=self.parse_npq_only,
+            user_token=self.user_token,
+            n_days=self.n_days,
+            telegram_handler=self.telegram_handler,
+            max_mass=self.max_mass,
+            logon_before_parsing=False,
+            headless=self.headless,
+            n_drivers=1,
+            fetch_backend="selenium",
+            incremental_full_mode=False
+        )
+
+        worker.delivery_interval = self.delivery_interval
+
+        try:
+
+            worker.__initialize_driver()
+
+        except Exception:
+
+            # a browser which started before the failure is not left running
+
+            if worker.driver is not None:
+                worker.driver.quit()
+
+            raise
+
+        return worker
+
+    def __get_product_card_of_pool(self, worker_queue: queue.Queue, link: str) -> Optional[dict]:
+
+        worker = worker_queue.get()
+
+        try:
+
+            product_card = worker.__get_product_card(link)
+
+            worker.n_pages += 1
+
+            # the main browser keeps its session, it is used for the cart later
+
+            if (worker is not self) and (worker.n_pages >= self.MAX_PAGES_PER_DRIVER):
+
+                worker.driver.quit()
+                worker.driver = None
+
+                worker.n_pages = 0
+
+                worker.__initialize_driver()
+
+        finally:
+
+            worker_queue.put(worker)
+
+        return product_card
+
+    def __get_product_cards_in_parallel(self, links: set) -> list:
+
+        # links are spread over a pool of browsers (the main one is one of them), every link goes to the first
+        # free browser, and cards are merged in the order of sorted links
+
+        link_list = sorted(links)
+
+        n_drivers = self.__get_n_drivers()
+
+        self.telegram_handler.log_info(f"Parsing {len(link_list)} product pages with {n_drivers} browsers")
+
+        future_list = []
+
+        try:
+
+            with ThreadPoolExecutor(max_workers=n_drivers) as executor:
+
+                future_list = [executor.submit(self.__create_worker) for _ in range(n_drivers - 1)]
+
+                worker_queue = queue.Queue()
+
+                worker_queue.put(self)
+
+                for future in future_list:
+                    worker_queue.put(future.result())
+
+                product_card_list = list(executor.map(
+                    lambda link: self.__get_product_card_of_pool(worker_queue, link),
+                    link_list
+                ))
+
+        finally:
+
+            # every started browser is quit, even if starting another one or parsing a page failed
+            # (the executor has waited for all of them by now)
+
+            for future in future_list:
+
+                if future.cancelled() or (future.exception() is not None):
+                    continue
+
+                worker = future.result()
+
+                if worker.driver is not None:
+
+                    worker.driver.quit()
+                    worker.driver = None
+
+        failed_link_list = [link for link, product_card in zip(link_list, product_card_list) if not product_card]
+
+        if failed_link_list:
+            self.telegram_handler.log_info(
+                f"Failed to parse {len(failed_link_list)} of {len(link_list)} product pages:\n"
+                + "\n".join(failed_link_list)
             )
 
+        return [product_card for product_card in product_card_list if product_card]
+
+    def __get_product_cards_by_browser(self, links) -> list:
+
+        if self.n_drivers > 1:
+            return self.__get_product_cards_in_parallel(links)
+
+        out = []
+
+        for link in links:
+
+            product_card = self.__get_product_card(link)
+
+            if product_card:
+                out.append(product_card)
+
+        return out
+
+    def __get_product_cards_by_http(self, links: set) -> list:
+
+        # pages are fetched over pooled keep-alive connections with the cookies of the browser session
+        # and parsed without rendering; pages which cannot be fetched or lack fields in their HTML
+        # (rendered by JavaScript) are left to the browsers, and cards are merged in the order of sorted links
+
+        link_list = sorted(links)
+
+        fetcher = HttpFetcher(
+            cookie_list=self.driver.get_cookies(),
+            user_agent=self.driver.execute_script("return navigator.userAgent"),
+            pool_size=self.N_HTTP_CONNECTIONS
+        )
+
+        def get_product_card_by_http(link):
+
+            html = fetcher.fetch(link)
+
+            return None if html is None else extract_product_card(html, link)
+
+        try:
+
+            with ThreadPoolExecutor(max_workers=self.N_HTTP_CONNECTIONS) as executor:
+                product_card_list = list(executor.map(get_product_card_by_http, link_list))
+
+        finally:
+
+            fetcher.close()
+
+        product_card_dict = {
+            link: product_card for link, product_card in zip(link_list, product_card_list) if product_card
+        }
+
+        browser_link_list = [link for link in link_list if link not in product_card_dict]
+
+        self.telegram_handler.log_info(
+            f"Parsed {len(product_card_dict)} of {len(link_list)} product pages over HTTP, "
+            f"{len(browser_link_list)} are left to the browser"
+        )
+
+        if browser_link_list:
+
+            for product_card in self.__get_product_cards_by_browser(browser_link_list):
+                product_card_dict[product_card["link"]] = product_card
+
+        return [product_card_dict[link] for link in link_list if link in product_card_dict]
+
     def __get_product_links(
         self,
         link: str
     ) -> set:
 
+        if self.fetch_backend == "http":
+
+            page_list = self.__crawl_section(link)
+
+            if page_list is not None:
+                return {product_link for page in page_list for product_link in page.link_list}
+
         links = set()
 
         self.driver.get(link)
@@ -383,28 +750,16 @@ class Parser:
 
     def __get_product_name(
         self,
-        link: Optional[str],
-        from_product_card: bool
+        link: str
     ) -> str:
 
-        if link is not None:
-            self.driver.get(link)
-
-        if not from_product_card:
-
-            WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
-                expected_conditions.presence_of_element_located((By.CLASS_NAME, "Product__title"))
-            )
-
-            elem_list = self.driver.find_elements(By.CLASS_NAME, "Product__title")
-
-        else:
+        self.driver.get(link)
 
-            WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
-                expected_conditions.presence_of_element_located((By.TAG_NAME, "a"))
-            )
+        WebDriverWait(self.driver, self.WAIT_TIMEOUT).until(
+            expected_conditions.presence_of_element_located((By.CLASS_NAME, "Product__title"))
+        )
 
-            elem_list = self.driver.find_elements(By.TAG_NAME, "a")
+        elem_list = self.driver.find_elements(By.CLASS_NAME, "Product__title")
 
         for elem in elem_list:
 
@@ -416,29 +771,6 @@ class Parser:
 
         return ""
 
-    @staticmethod
-    def __convert_to_grams(
-        quantity: str
-    ) -> Optional[int]:
-
-        pattern = r"(\d+(?:[,.]\d+)?)\s*(г|кг|мл|л)"
-        match = re.match(pattern, quantity)
-
-        if match:
-
-            value = float(match.group(1).replace(",", "."))
-            unit = match.group(2).lower()
-
-            return (
-                int(value * 1000)
-                if unit in ["кг", "л"]
-                else int(value)
-            )
-
-        else:
-
-            return None
-
     def __get_mass(
         self
     ) -> Optional[int]:
@@ -451,7 +783,7 @@ class Parser:
 
         mass = self.driver.find_element(By.CSS_SELECTOR, "div[class*='ProductCard__weight']").text
 
-        mass = self.__convert_to_grams(mass)
+        mass = convert_to_grams(mass)
 
         return mass
 
@@ -517,7 +849,7 @@ class Parser:
 
                     cur_text_list = elem.text.split('\n')
 
-                    if cur_text_list[0] == 'Пищевая и энергетическая ценность в 100 г.':
+                    if cur_text_list[0] == NUTRITION_TITLE:
                         return cur_text_list[1]
 
                 return ""
@@ -526,29 +858,6 @@ class Parser:
 
                 return ""
 
-    @staticmethod
-    def __extract_nutritional_info(nutritional_value: str) -> Tuple:
-
-        pattern = r"[бБ]елки\s?(\d+(?:[,.]\d+)?)\s?(?:г)?[;,.]?\s?" \
-                  r"жиры\s?(\d+(?:[,.]\d*)?)\s?(?:г)?[;,.]?\s?" \
-                  r"углеводы\s?(\d+(?:[,.]\d+)?)\s?(?:г)?[;,.]?\s?" \
-                  r"(\d+(?:[,.]\d*)?)\s?ккал"
-
-        matches = re.match(pattern, nutritional_value)
-
-        if matches:
-
-            proteins = matches.group(1).replace(",", ".")
-            fats = matches.group(2).replace(",", ".")
-            carbohydrates = matches.group(3).replace(",", ".")
-            calories = matches.group(4).replace(",", ".")
-
-            return proteins, fats, carbohydrates, calories
-
-        else:
-
-            return None, None, None, None
-
     @staticmethod
     def __get_cart_text(
         product_card
@@ -570,18 +879,10 @@ class Parser:
         return ""
 
     def __get_quantity(
-        self,
-        from_product_card: bool
+        self
     ) -> int:
 
-        elem_list = self.driver.find_elements(
-            By.CSS_SELECTOR,
-            (
-                "div[class*='ProductLkRest rtext']"
-                if not from_product_card
-                else "div[class*='ProductCard__Rest caption']"
-            )
-        )
+        elem_list = self.driver.find_elements(By.CSS_SELECTOR, "div[class*='ProductLkRest rtext']")
 
         for elem in elem_list:
 
@@ -597,18 +898,7 @@ class Parser:
 
             quantity = ""
 
-        cart_text = self.__get_cart_text(self.driver)
-
-        if ("В наличии" in quantity) and (
-            (cart_text == "В корзину") or re.match(r"\d+ шт\d+руб", cart_text.replace("\n", ""))
-        ):
-
-            matches = re.search(r"\d+", quantity.replace(" ", ""))
-
-            if matches:
-                return int(matches.group())
-
-        return 0
+        return extract_quantity(quantity, self.__get_cart_text(self.driver))
 
     def __get_product_card(
         self,
@@ -619,13 +909,13 @@ class Parser:
 
         try:
 
-            card["name"] = self.__get_product_name(link, from_product_card=False)
+            card["name"] = self.__get_product_name(link)
             card["mass"] = self.__get_mass()
-            card["quantity"] = self.__get_quantity(from_product_card=False)
+            card["quantity"] = self.__get_quantity()
             card["price"] = self.__get_price()
 
             nutritional_value = self.__get_nutritional_value()
-            nutritional_info = self.__extract_nutritional_info(nutritional_value)
+            nutritional_info = extract_nutritional_info(nutritional_value)
 
             (
                 card["proteins"],
@@ -725,7 +1015,9 @@ class Parser:
             .str.replace(" ", "") \
             .astype(np.float64).astype(np.int32)
 
-        if not self.parse_npq_only:
+        # an incremental full parse stores only prices and quantities, as npq mode does
+
+        if "mass" in food_df.columns:
             food_df["calories"] = food_df["calories"] \
                 .str.replace(" ", "") \
                 .astype(np.float64)
@@ -748,15 +1040,13 @@ class Parser:
 
         self.food_df = food_df
 
-    def __update_dishlist(self):
-
-        path_to_file = Path(Path(__file__).parent, "..", "data", "dishlist.xlsx")
+    def __update_dishlist(self, save_dishlist: bool):
 
         parsed_npq_only = "mass" not in self.food_df.columns
 
         if parsed_npq_only:
 
-            dishlist_df = pd.read_excel(path_to_file, index_col='name')
+            dishlist_df = pd.read_excel(self.DISHLIST_PATH, index_col='name')
 
             dishlist_df = dishlist_df.loc[~dishlist_df.index.duplicated()]
 
@@ -771,9 +1061,13 @@ class Parser:
             subset=["calories", "proteins", "fats", "carbohydrates", "mass"]
         )
 
-        if not parsed_npq_only:
+        if (not parsed_npq_only) and save_dishlist:
 
-            self.food_df.drop(columns=["quantity", "price"]).sort_index().to_excel(path_to_file)
+            self.food_df \
+                .drop(columns=["quantity", "price"]) \
+                .assign(parsed_at=pd.Timestamp.now().floor("s")) \
+                .sort_index() \
+                .to_excel(self.DISHLIST_PATH)
 
     def __filter_by_mass(self):
 
@@ -804,29 +1098,46 @@ class Parser:
 
         self.food_df = self.food_df.loc[self.food_df["quantity"] > 0]
 
-    def get_and_filter_data(self):
+    def get_and_filter_data(self, save_dishlist: bool):
+
+        # nutrition facts of a full parse are saved to the dishlist for later npq parses
 
         self.__read_and_convert_data()
-        self.__update_dishlist()
+        self.__update_dishlist(save_dishlist)
         self.__filter_by_mass()
 
+        # the frame with strings in every row is dropped, the compact catalog goes to the optimizer and the cart
+
+        self.catalog = Catalog.from_food_df(self.food_df)
+
+        self.food_df = None
+
+    def write_catalog(self):
+
+        # it is the input of optimizer_api.py, which plans without the bot
+
+        self.catalog.write(Path(Path(__file__).parent, "..", "output", f"{self.user_token}_catalog.csv"))
+
     def launch_cart(
         self,
         min_dict_list: list,
-        food_dict: dict,
+        catalog: Catalog,
     ):
 
         self.__initialize_driver()
 
         final_dict = {}
 
+        link_dict = catalog.get_link_dict([name for min_dict in min_dict_list for name in min_dict])
+
+        # a dish may be taken on several days, then its quantities are summed
+
         for min_dict in min_dict_list:
-            cur_dict = {
-                food_dict[name]["link"]: quantity
-                for name, quantity in min_dict.items()
-            }
+            for name, quantity in min_dict.items():
+
+                link = link_dict[name]
 
-            final_dict.update(cur_dict)
+                final_dict[link] = final_dict.get(link, 0) + quantity
 
         self.__add_products_to_cart(final_dict)
 
@@ -852,7 +1163,7 @@ class Parser:
     ):
 
         self.driver.get(link)
-        available_quantity = min(req_quantity, self.__get_quantity(from_product_card=False))
+        available_quantity = min(req_quantity, self.__get_quantity())
 
         if available_quantity:
 
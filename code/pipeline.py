@@ -6,6 +6,9 @@ from mongo_connector import MongoConnector
 from telegram_handler import TelegramHandler
 from optimizer import Optimizer
 from parser import Parser
+from solution_cache import SolutionCache
+from pareto_front import ParetoFront
+from plan_store import PlanStore
 from utils import get_input_option
 
 
@@ -22,7 +25,20 @@ class Pipeline:
         headless,
         telegram_handler,
         use_mongo,
-        mongo_connector
+        mongo_connector,
+        solver_mode,
+        sample_subsets,
+        sampling,
+        seed,
+        n_workers,
+        n_solutions,
+        time_budget,
+        use_solution_cache,
+        use_last_plan,
+        n_drivers,
+        fetch_backend,
+        incremental_full_mode,
+        write_catalog
     ):
 
         self.n_days = n_days
@@ -41,6 +57,20 @@ class Pipeline:
 
         self.mongo_connector = mongo_connector
 
+        self.solver_mode = solver_mode
+        self.sample_subsets = sample_subsets
+        self.sampling = sampling
+        self.seed = seed
+        self.n_workers = n_workers
+        self.n_solutions = n_solutions
+        self.time_budget = time_budget
+        self.use_solution_cache = use_solution_cache
+        self.use_last_plan = use_last_plan
+        self.n_drivers = n_drivers
+        self.fetch_backend = fetch_backend
+        self.incremental_full_mode = incremental_full_mode
+        self.write_catalog = write_catalog
+
         self.config = {}
 
         if telegram_handler is not None:
@@ -482,7 +512,10 @@ ___maximum price for daily set___: {cur_config["food_restrictions"]["start_min_p
             telegram_handler=self.telegram_handler,
             max_mass=self.food_restrictions["max_mass"],
             logon_before_parsing=self.logon_before_parsing,
-            headless=self.headless
+            headless=self.headless,
+            n_drivers=self.n_drivers,
+            fetch_backend=self.fetch_backend,
+            incremental_full_mode=self.incremental_full_mode
         )
 
     def __initialize_optimizer(self):
@@ -499,7 +532,25 @@ ___maximum price for daily set___: {cur_config["food_restrictions"]["start_min_p
             carbo_lower=self.food_restrictions["carbo_lower"],
             carbo_upper=self.food_restrictions["carbo_upper"],
             start_min_price=self.food_restrictions["start_min_price"],
-            parser=self.parser
+            solver_mode=self.solver_mode,
+            sample_subsets=self.sample_subsets,
+            sampling=self.sampling,
+            seed=self.seed,
+            n_workers=self.n_workers,
+            n_solutions=self.n_solutions,
+            time_budget=self.time_budget,
+            solution_cache=(
+                SolutionCache(mongo_connector=self.mongo_connector if self.use_mongo else None)
+                if self.use_solution_cache else None
+            ),
+            pareto_front=(
+                ParetoFront(path=Path(Path(__file__).parent, "..", "output", f"{self.user_token}_pareto.json"))
+                if self.solver_mode == "pareto" else None
+            ),
+            plan_store=(
+                PlanStore(path=Path(Path(__file__).parent, "..", "output", f"{self.user_token}_plan.json"))
+                if self.use_last_plan else None
+            )
         )
 
     def run(self):
@@ -523,15 +574,29 @@ ___maximum price for daily set___: {cur_config["food_restrictions"]["start_min_p
 
         start_time = time()
 
-        self.parser.get_and_filter_data()
+        self.parser.get_and_filter_data(save_dishlist=True)
+
+        if self.write_catalog:
+            self.parser.write_catalog()
+
+        self.telegram_handler.log_info(
+            f"Finished filtering data: {time() - start_time:.2f} sec, "
+            f"{self.parser.catalog.size} dishes take {self.parser.catalog.get_nbytes() / 1024:.0f} KB"
+        )
+
+        self.telegram_handler.log_info("Started removing dominated dishes")
+
+        start_time = time()
+
+        catalog = self.optimizer.remove_dominated_dishes(self.parser.catalog)
 
-        self.telegram_handler.log_info(f"Finished filtering data: {time() - start_time:.2f} sec")
+        self.telegram_handler.log_info(f"Finished removing dominated dishes: {time() - start_time:.2f} sec")
 
         self.telegram_handler.log_info("Started optimizing")
 
         start_time = time()
 
-        food_dict = self.optimizer.launch_optimizer(food_df=self.parser.food_df)
+        self.optimizer.launch_optimizer(catalog=catalog)
 
         self.telegram_handler.log_info(f"Finished optimizing: {time() - start_time:.2f} sec")
 
@@ -541,7 +606,7 @@ ___maximum price for daily set___: {cur_config["food_restrictions"]["start_min_p
 
         self.parser.launch_cart(
             self.optimizer.min_dict_list,
-            food_dict,
+            catalog,
         )
 
         self.telegram_handler.log_info(f"Finished adding to cart: {time() - start_time:.2f} sec")
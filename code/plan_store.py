@@ -0,0 +1,52 @@
+import json
+import threading
+
+from pathlib import Path
+
+import pandas as pd
+
+
+class PlanStore:
+
+    # the last accepted sets of one user with prices of their dishes at that time: after a refresh of the catalog
+    # they are checked against it, so a new search is needed only for days whose dishes are gone or cost more;
+    # the plan is stored in a JSON file next to the catalog of the user
+
+    FILE_LOCK = threading.Lock()
+
+    def __init__(self, path: Path):
+
+        self.path = path
+
+    def get_plan(self, restriction_dict: dict):
+
+        # returns the list of sets by days as lists of (name, quantity, price)
+        # or None, if there is no plan for these restrictions
+
+        with self.FILE_LOCK:
+
+            if not self.path.exists():
+                return None
+
+            plan = json.load(self.path.open(encoding="utf-8"))
+
+        if plan["restriction_dict"] != restriction_dict:
+            return None
+
+        return [
+            [(name, quantity, price) for name, quantity, price in triple_list]
+            for triple_list in plan["triple_list_list"]
+        ]
+
+    def set_plan(self, food_df: pd.DataFrame, restriction_dict: dict, min_dict_list: list):
+
+        plan = {
+            "restriction_dict": restriction_dict,
+            "triple_list_list": [
+                [[name, int(quantity), float(food_df.at[name, "price"])] for name, quantity in min_dict.items()]
+                for min_dict in min_dict_list
+            ],
+        }
+
+        with self.FILE_LOCK:
+            json.dump(plan, self.path.open("w", encoding="utf-8"), indent=4, ensure_ascii=False)
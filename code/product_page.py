@@ -0,0 +1,318 @@
+import re
+
+from html.parser import HTMLParser
+from typing import Optional, Tuple
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+NUTRITION_TITLE = "Пищевая и энергетическая ценность в 100 г."
+
+HIDDEN_CLASS_SET = {"hidden", "_hidden", "is-hidden", "d-none"}
+
+
+def convert_to_grams(quantity: str) -> Optional[int]:
+
+    pattern = r"(\d+(?:[,.]\d+)?)\s*(г|кг|мл|л)"
+    match = re.match(pattern, quantity)
+
+    if match:
+
+        value = float(match.group(1).replace(",", "."))
+        unit = match.group(2).lower()
+
+        return (
+            int(value * 1000)
+            if unit in ["кг", "л"]
+            else int(value)
+        )
+
+    else:
+
+        return None
+
+
+def extract_nutritional_info(nutritional_value: str) -> Tuple:
+
+    pattern = r"[бБ]елки\s?(\d+(?:[,.]\d+)?)\s?(?:г)?[;,.]?\s?" \
+              r"жиры\s?(\d+(?:[,.]\d*)?)\s?(?:г)?[;,.]?\s?" \
+              r"углеводы\s?(\d+(?:[,.]\d+)?)\s?(?:г)?[;,.]?\s?" \
+              r"(\d+(?:[,.]\d*)?)\s?ккал"
+
+    matches = re.match(pattern, nutritional_value)
+
+    if matches:
+
+        proteins = matches.group(1).replace(",", ".")
+        fats = matches.group(2).replace(",", ".")
+        carbohydrates = matches.group(3).replace(",", ".")
+        calories = matches.group(4).replace(",", ".")
+
+        return proteins, fats, carbohydrates, calories
+
+    else:
+
+        return None, None, None, None
+
+
+def extract_quantity(rest_text: str, cart_text: str) -> int:
+
+    # a dish is counted only if it is in stock and can be added to the cart
+
+    if ("В наличии" in rest_text) and (
+        (cart_text == "В корзину") or re.match(r"\d+ шт\d+руб", cart_text.replace("\n", ""))
+    ):
+
+        matches = re.search(r"\d+", rest_text.replace(" ", ""))
+
+        if matches:
+            return int(matches.group())
+
+    return 0
+
+
+def is_hidden_element(attr_dict: dict) -> bool:
+
+    # elements which the browser would not render, judging by their attributes only (stylesheets are not read);
+    # Selenium gives no text for them and for all their children
+
+    style = (attr_dict.get("style") or "").replace(" ", "").lower()
+
+    return (
+        ("hidden" in attr_dict)
+        or ("display:none" in style)
+        or ("visibility:hidden" in style)
+        or bool(HIDDEN_CLASS_SET & set((attr_dict.get("class") or "").split()))
+    )
+
+
+def extract_npq_records(raw_card_list: list) -> list:
+
+    # npq records (name, price, quantity) from texts of catalog cards as dicts with "name", "price", "rest_text"
+    # and "cart_text", in their order; a dish shown twice is taken once
+
+    out = []
+
+    name_set = set()
+
+    for raw_card in raw_card_list:
+
+        if raw_card["name"] in name_set:
+            continue
+
+        name_set.add(raw_card["name"])
+
+        out.append(
+            {
+                'name': raw_card["name"],
+                'price': raw_card["price"],
+                'quantity': extract_quantity(raw_card["rest_text"], raw_card["cart_text"]),
+            }
+        )
+
+    return out
+
+
+class ProductPageParser(HTMLParser):
+
+    # texts of elements with one of the classes (or with a class attribute containing one of the substrings)
+    # in the order of the page, like the text of Selenium elements: text nodes with collapsed spaces
+    # are joined by new lines, and hidden elements give no text
+
+    CLASS_KEY_LIST = [
+        "Product__title",
+        "CartButton__inner",
+        "Price__value",
+        "Product__details-text",
+        "VV23_DetailProdPageInfoDescItem",
+    ]
+
+    SUBSTRING_KEY_LIST = [
+        "ProductCard__weight",
+        "ProductLkRest rtext",
+    ]
+
+    VOID_TAG_SET = {
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+    }
+
+    SKIPPED_TAG_SET = {"script", "style", "noscript", "template"}
+
+    def __init__(self):
+
+        super().__init__(convert_charrefs=True)
+
+        self.text_list_dict = {key: [] for key in self.CLASS_KEY_LIST + self.SUBSTRING_KEY_LIST}
+
+        # open elements as (tag, keys of the element, text list of the element or None, whether it is hidden)
+
+        self.element_stack = []
+
+    def handle_starttag(self, tag, attrs):
+
+        if tag in self.VOID_TAG_SET:
+            return
+
+        attr_dict = dict(attrs)
+
+        is_hidden = (bool(self.element_stack) and self.element_stack[-1][3]) or is_hidden_element(attr_dict)
+
+        if is_hidden:
+
+            self.element_stack.append((tag, [], None, True))
+
+            return
+
+        class_text = attr_dict.get("class") or ""
+
+        class_set = set(class_text.split())
+
+        key_list = [key for key in self.CLASS_KEY_LIST if key in class_set] + \
+                   [key for key in self.SUBSTRING_KEY_LIST if key in class_text]
+
+        self.element_stack.append((tag, key_list, [] if key_list else None, False))
+
+    def handle_endtag(self, tag):
+
+        # elements which are not closed in the page end with their parent
+
+        if not any(element[0] == tag for element in self.element_stack):
+            return
+
+        while self.element_stack:
+
+            cur_tag, key_list, text_list, _ = self.element_stack.pop()
+
+            for key in key_list:
+                self.text_list_dict[key].append("\n".join(text_list))
+
+            if cur_tag == tag:
+                return
+
+    def handle_data(self, data):
+
+        if any(element[0] in self.SKIPPED_TAG_SET for element in self.element_stack):
+            return
+
+        if self.element_stack and self.element_stack[-1][3]:
+            return
+
+        text = " ".join(data.split())
+
+        if text == "":
+            return
+
+        for _, _, text_list, _ in self.element_stack:
+            if text_list is not None:
+                text_list.append(text)
+
+    def get_first_text(self, key: str) -> str:
+
+        for text in self.text_list_dict[key]:
+            if text != "":
+                return text
+
+        return ""
+
+
+def extract_product_card(html: str, link: str) -> Optional[dict]:
+
+    # the same fields as Parser.__get_product_card gets with Selenium, None if the page is rendered
+    # by JavaScript and has no title, price or mass in its HTML
+
+    page_parser = ProductPageParser()
+
+    page_parser.feed(html)
+    page_parser.close()
+
+    name = page_parser.get_first_text("Product__title")
+    price = page_parser.get_first_text("Price__value")
+    mass = convert_to_grams(page_parser.get_first_text("ProductCard__weight"))
+
+    if (name == "") or (price == "") or (mass is None):
+        return None
+
+    nutritional_value = page_parser.get_first_text("Product__details-text")
+
+    if nutritional_value == "":
+
+        for text in page_parser.text_list_dict["VV23_DetailProdPageInfoDescItem"]:
+
+            cur_text_list = text.split("\n")
+
+            if (cur_text_list[0] == NUTRITION_TITLE) and (len(cur_text_list) > 1):
+
+                nutritional_value = cur_text_list[1]
+
+                break
+
+    card = {
+        "name": name,
+        "mass": mass,
+        "quantity": extract_quantity(
+            page_parser.get_first_text("ProductLkRest rtext"),
+            page_parser.get_first_text("CartButton__inner")
+        ),
+        "price": price,
+    }
+
+    (
+        card["proteins"],
+        card["fats"],
+        card["carbohydrates"],
+        card["calories"],
+    ) = extract_nutritional_info(nutritional_value)
+
+    card["link"] = link
+
+    return card
+
+
+class HttpFetcher:
+
+    # product pages over keep-alive connections of one session, with the cookies of the browser,
+    # so that stock and prices are given for the same address
+
+    TIMEOUT = 10  # seconds
+
+    def __init__(
+        self,
+        cookie_list: list,
+        user_agent: str,
+        pool_size: int,
+    ):
+
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.session.headers["User-Agent"] = user_agent
+
+        for cookie in cookie_list:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"))
+
+    def fetch(self, link: str) -> Optional[str]:
+
+        # None if the page cannot be fetched, then it is left to the browser
+
+        try:
+
+            response = self.session.get(link, timeout=self.TIMEOUT)
+
+        except requests.RequestException:
+
+            return None
+
+        if response.status_code != 200:
+            return None
+
+        return response.text
+
+    def close(self):
+
+        self.session.close()
@@ -0,0 +1,46 @@
+import time
+
+
+class SearchProgress:
+
+    # the recursive and bounded searches call it in every node instead of reading the clock: nodes are counted,
+    # and once in CHECK_INTERVAL nodes the best price is reported and the deadline is checked, as IterativeSolver does;
+    # after the deadline every node is cut, so the search returns the best set found by then
+    #
+    # searches without a deadline get no object and count nothing, an extra call in every node would slow them down
+
+    CHECK_INTERVAL = 1 << 16  # nodes between checks of the deadline and progress reports
+
+    def __init__(self, deadline: float, progress_callback=None, max_price: float = None, check_interval=CHECK_INTERVAL):
+
+        # progress_callback gets the best price (None if there is no set yet) and explored nodes,
+        # sets are always cheaper than max_price, so the best price equal to it means that no set is found
+
+        self.deadline = deadline
+        self.progress_callback = progress_callback
+        self.max_price = max_price
+
+        self.check_interval = check_interval
+        self.next_check_nodes = check_interval
+
+        self.n_nodes = 0
+        self.is_time_over = False
+
+    def is_over(self, min_price) -> bool:
+
+        if self.is_time_over:
+            return True
+
+        self.n_nodes += 1
+
+        if self.n_nodes == self.next_check_nodes:
+
+            self.next_check_nodes += self.check_interval
+
+            if self.progress_callback is not None:
+                self.progress_callback(None if min_price == self.max_price else min_price, self.n_nodes)
+
+            if time.time() > self.deadline:
+                self.is_time_over = True
+
+        return self.is_time_over
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+import time
+
+from pathlib import Path
+
+import pandas as pd
+
+from mongo_connector import MongoConnector
+
+
+CACHE_PATH = Path(Path(__file__).parent, "..", "data", "solution_cache.json")
+
+
+class SolutionCache:
+
+    # accepted sets of dishes for the same catalog and restrictions: the key is a hash of prices, quantities
+    # and nutrients of the filtered catalog and of the restrictions; solutions are stored in MongoDB
+    # or in a JSON file, the least recently used ones are evicted and the old ones expire
+
+    MAX_SIZE = 100
+    TTL = 24 * 60 * 60  # seconds without use, prices and quantities rarely stay the same for longer
+
+    KEY_COLUMNS = ["price", "quantity", "calories", "proteins", "fats", "carbo"]
+
+    FILE_LOCK = threading.Lock()  # the bot serves users in many threads, and they share the file
+
+    def __init__(
+        self,
+        mongo_connector: MongoConnector = None,
+        path: Path = CACHE_PATH,
+    ):
+
+        self.mongo_connector = mongo_connector
+
+        self.path = path
+
+    @staticmethod
+    def get_key(food_df: pd.DataFrame, restriction_dict: dict) -> str:
+
+        # names of dishes are the index of the catalog, so they are hashed too
+
+        hasher = hashlib.sha256()
+
+        hasher.update(
+            pd.util.hash_pandas_object(food_df[SolutionCache.KEY_COLUMNS].sort_index(), index=True).values.tobytes()
+        )
+        hasher.update(json.dumps(restriction_dict, sort_keys=True).encode("utf-8"))
+
+        return hasher.hexdigest()
+
+    def get_solution(self, food_df: pd.DataFrame, restriction_dict: dict):
+
+        # returns the list of sets by days or None, if there is no solution with quantities still available
+
+        key = self.get_key(food_df, restriction_dict)
+
+        if self.mongo_connector is not None:
+
+            solution = self.mongo_connector.get_solution(key)
+
+        else:
+
+            with self.FILE_LOCK:
+
+                solution_dict = self.__load_solution_dict()
+
+                solution = solution_dict.get(key)
+
+                if solution is not None:
+
+                    solution["last_used"] = time.time()
+
+                    self.__save_solution_dict(solution_dict)
+
+        if solution is None:
+            return None
+
+        min_dict_list = [dict(pair_list) for pair_list in solution["pair_list_list"]]
+
+        # a dish may be taken on several days, so quantities of all days are summed
+
+        quantity_dict = {}
+
+        for min_dict in min_dict_list:
+            for name, quantity in min_dict.items():
+                quantity_dict[name] = quantity_dict.get(name, 0) + quantity
+
+        for name, quantity in quantity_dict.items():
+            if (name not in food_df.index) or (food_df.at[name, "quantity"] < quantity):
+                return None
+
+        return min_dict_list
+
+    def set_solution(self, food_df: pd.DataFrame, restriction_dict: dict, min_dict_list: list):
+
+        key = self.get_key(food_df, restriction_dict)
+
+        # names of dishes may contain dots, so they are stored as values, not as keys of MongoDB documents
+
+        solution = {
+            "pair_list_list": [
+                [[name, int(quantity)] for name, quantity in min_dict.items()]
+                for min_dict in min_dict_list
+            ],
+        }
+
+        if self.mongo_connector is not None:
+
+            self.mongo_connector.set_solution(solution, key, self.MAX_SIZE, self.TTL)
+
+            return
+
+        with self.FILE_LOCK:
+
+            solution_dict = self.__load_solution_dict()
+
+            solution["last_used"] = time.time()
+
+            solution_dict[key] = solution
+
+            # the least recently used solutions go first
+
+            key_list = sorted(solution_dict, key=lambda cur_key: solution_dict[cur_key]["last_used"])
+
+            for cur_key in key_list[:-self.MAX_SIZE]:
+                del solution_dict[cur_key]
+
+            self.__save_solution_dict(solution_dict)
+
+    def __load_solution_dict(self) -> dict:
+
+        if not self.path.exists():
+            return {}
+
+        solution_dict = json.load(self.path.open(encoding="utf-8"))
+
+        min_last_used = time.time() - self.TTL
+
+        return {
+            key: solution
+            for key, solution in solution_dict.items()
+            if solution["last_used"] >= min_last_used
+        }
+
+    def __save_solution_dict(self, solution_dict: dict):
+
+        json.dump(solution_dict, self.path.open("w", encoding="utf-8"), indent=4, ensure_ascii=False)
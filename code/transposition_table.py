@@ -0,0 +1,86 @@
+import math
+
+from collections import OrderedDict
+
+
+class TranspositionTable:
+
+    # the recursive search reaches the same dish with almost the same residual bounds along many paths;
+    # the table keeps a lower bound on the price of the rest of the set for such states, so a repeated
+    # subtree is cut when it cannot be cheaper than the current minimum
+    #
+    # residual bounds of two paths are shifted by the difference of their nutrients, so a state with higher
+    # lower bounds has higher upper bounds too and is never harder than the stored one in both of them;
+    # but if no dish of the stored subtree was rejected by an upper bound, its price does not depend on them,
+    # and the entry serves every state with not smaller lower bounds (for example, a path which took
+    # fewer dishes before), so the key has only lower bounds
+
+    MAX_SIZE = 200_000  # entries, the least recently used ones are evicted
+
+    def __init__(self, step_tuple: tuple, max_size: int = MAX_SIZE):
+
+        self.step_tuple = step_tuple  # residual bounds closer than a step share one entry of the table
+
+        self.max_size = max_size
+
+        self.entry_dict = OrderedDict()
+
+        self.n_lookups = 0
+        self.n_hits = 0
+        self.n_cutoffs = 0
+
+        self.n_nodes = 0  # nodes of the search, counted by it to know the subtree sizes of entries
+        self.n_upper_rejections = 0  # dishes rejected by upper bounds, counted by the search
+        self.n_saved_nodes = 0  # nodes of the subtrees which were cut, as they were explored when stored
+
+    def get_key(self, i_dish, rest_quantity, lower_tuple) -> tuple:
+
+        return (
+            i_dish,
+            rest_quantity,
+            *[math.floor(value / step) for value, step in zip(lower_tuple, self.step_tuple)],
+        )
+
+    def get_entry(self, key, lower_tuple, upper_tuple):
+
+        # an entry is used only if the current state is not easier than the stored one:
+        # not smaller lower bounds and not bigger upper bounds (unless they did not matter for the entry),
+        # so the rest of the set cannot be cheaper; returns (the lowest price of the rest, nodes of its subtree)
+        # or None
+
+        self.n_lookups += 1
+
+        entry = self.entry_dict.get(key)
+
+        if entry is None:
+            return None
+
+        entry_lower_tuple, entry_upper_tuple, min_rest_price, n_subtree_nodes, is_upper_free = entry
+
+        for value, entry_value in zip(lower_tuple, entry_lower_tuple):
+            if value < entry_value:
+                return None
+
+        if not is_upper_free:
+            for value, entry_value in zip(upper_tuple, entry_upper_tuple):
+                if value > entry_value:
+                    return None
+
+        self.n_hits += 1
+
+        self.entry_dict.move_to_end(key)
+
+        return min_rest_price, n_subtree_nodes
+
+    def set_entry(self, key, lower_tuple, upper_tuple, min_rest_price, n_subtree_nodes, is_upper_free):
+
+        self.entry_dict[key] = (lower_tuple, upper_tuple, min_rest_price, n_subtree_nodes, is_upper_free)
+
+        self.entry_dict.move_to_end(key)
+
+        if len(self.entry_dict) > self.max_size:
+            self.entry_dict.popitem(last=False)
+
+    def get_hit_rate(self) -> float:
+
+        return self.n_hits / self.n_lookups if self.n_lookups > 0 else 0.
@@ -0,0 +1,159 @@
+import sys
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "code"))
+
+from catalog_crawler import CatalogCrawler  # noqa: E402
+from product_page import HttpFetcher, extract_npq_records  # noqa: E402
+
+
+N_PAGES = 6
+N_CARDS = 3
+FAILED_PAGE = 3  # the first request of this page is answered with 503
+
+
+def create_page(i_page: int) -> str:
+
+    # a catalog page with cards in the main column (with hidden old prices), a pagination container showing
+    # only neighbouring pages, and numbered links outside of it which are not pages
+
+    card_list = [
+        f"""
+        <div class="ProductCard">
+            <div class="ProductCard__image">
+                <a href="/goods/dish-{i_page}-{i_card}.html"><img src="/dish.jpg"></a>
+                <a href="/goods/dish-{i_page}-{i_card}.html#reviews">{i_card + 1}</a>
+            </div>
+            <div class="ProductCard__content">
+                <a href="/goods/dish-{i_page}-{i_card}.html"> Блюдо {i_page}-{i_card} </a>
+                <span class="Price__value" style="display: none">{200 + i_card}</span>
+                <span class="Price__value">{100 + i_card}</span>
+                <div class="ProductCard__Rest caption">В наличии {i_card + 1} шт</div>
+                <button class="CartButton__inner">В корзину</button>
+            </div>
+        </div>
+        """
+        for i_card in range(N_CARDS)
+    ]
+
+    pager_list = [
+        f'<a class="VV_Pager__Item" href="/goods/gotovaya-eda/?PAGEN_1={i}">{i}</a>'
+        for i in range(max(1, i_page - 2), min(N_PAGES, i_page + 2) + 1)
+    ]
+
+    if i_page < N_PAGES:
+        pager_list.append(f'<a href="/goods/gotovaya-eda/?PAGEN_1={i_page + 1}#top">Вперёд</a>')
+
+    return f"""
+    <html><body>
+        <div class="Banner"><a href="/actions/sale-7/">7</a></div>
+        <div class="Catalog__col Catalog__col--main">{"".join(card_list)}</div>
+        <div class="VV_Pager js-lk-pager">{"".join(pager_list)}</div>
+        <div class="Footer"><a href="/goods/gotovaya-eda/?PAGEN_1=99">99</a></div>
+    </body></html>
+    """
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    path_list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+
+        self.path_list.append(self.path)
+
+        query_dict = parse_qs(urlparse(self.path).query)
+
+        if (not self.path.startswith("/goods/gotovaya-eda/")) or (query_dict.get("PAGEN_1") == ["99"]):
+            status, body = 404, b""
+        elif "PAGEN_1" not in query_dict:
+            status, body = 200, create_page(1).encode()
+        elif (int(query_dict["PAGEN_1"][0]) == FAILED_PAGE) and (self.path_list.count(self.path) == 1):
+            status, body = 503, b""
+        else:
+            status, body = 200, create_page(int(query_dict["PAGEN_1"][0])).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CatalogCrawlerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        CatalogHandler.path_list = []
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.fetcher = HttpFetcher([], "test", CatalogCrawler.N_CONNECTIONS)
+
+        self.crawler = CatalogCrawler(self.fetcher)
+
+        self.crawler.MAX_RATE = 100
+        self.crawler.BACKOFF = 0.01
+
+    def tearDown(self):
+
+        self.fetcher.close()
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_crawl(self):
+
+        section_link = f"http://127.0.0.1:{self.server.server_port}/goods/gotovaya-eda/"
+
+        page_list = self.crawler.crawl(section_link)
+
+        self.assertIsNotNone(page_list)
+
+        # every page once (the first one also by its number), numbered links outside of the pagination
+        # are not followed
+
+        self.assertEqual(len(page_list), N_PAGES + 1)
+
+        self.assertEqual(
+            sorted(set(CatalogHandler.path_list)),
+            sorted(["/goods/gotovaya-eda/"] + [f"/goods/gotovaya-eda/?PAGEN_1={i}" for i in range(1, N_PAGES + 1)])
+        )
+
+        self.assertEqual(page_list[0].page_link_list[0], f"{section_link}?PAGEN_1=2")
+
+        for page in page_list:
+            self.assertTrue(all("PAGEN_1=" in page_link for page_link in page.page_link_list))
+
+        npq_record_list = extract_npq_records([raw_card for page in page_list for raw_card in page.get_raw_card_list()])
+
+        self.assertEqual(len(npq_record_list), N_PAGES * N_CARDS)
+
+        self.assertEqual(npq_record_list[0], {"name": "Блюдо 1-0", "price": "100", "quantity": 1})
+
+        link_set = {link for page in page_list for link in page.link_list}
+
+        self.assertEqual(
+            link_set,
+            {
+                f"http://127.0.0.1:{self.server.server_port}/goods/dish-{i_page}-{i_card}.html"
+                for i_page in range(1, N_PAGES + 1)
+                for i_card in range(N_CARDS)
+            }
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
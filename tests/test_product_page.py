@@ -0,0 +1,48 @@
+import sys
+import unittest
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "code"))
+
+from product_page import extract_product_card  # noqa: E402
+
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures"
+
+
+class ProductPageTest(unittest.TestCase):
+
+    def test_saved_page(self):
+
+        # the card of a saved product page with hidden old and alternate prices, rest and cart texts,
+        # which Selenium does not see
+
+        html = Path(FIXTURE_PATH, "product_page.html").read_text(encoding="utf-8")
+
+        link = "https://vkusvill.ru/goods/syrniki-iz-tvoroga-kafe-12345.html"
+
+        self.assertEqual(
+            extract_product_card(html, link),
+            {
+                "name": "Сырники из творога, кафе",
+                "mass": 180,
+                "quantity": 7,
+                "price": "259",
+                "proteins": "15.4",
+                "fats": "9",
+                "carbohydrates": "21.3",
+                "calories": "230",
+                "link": link,
+            }
+        )
+
+    def test_page_rendered_by_javascript(self):
+
+        html = "<html><body><div id='app'></div><script>render()</script></body></html>"
+
+        self.assertIsNone(extract_product_card(html, "https://vkusvill.ru/goods/1.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import sys
+import itertools
+import unittest
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "code"))
+
+from catalog import Catalog  # noqa: E402
+from integer_solver import IntegerSolver  # noqa: E402
+from meet_in_middle_solver import MeetInMiddleSolver  # noqa: E402
+from optimizer import Optimizer  # noqa: E402
+from optimizer_api import SilentTelegramHandler  # noqa: E402
+
+
+N_PROBLEMS = 20
+N_DISHES = 5
+MAX_QUANTITY = 3
+MAX_PRICE = 10 ** 6  # no set is that expensive
+N_SOLUTIONS = 3
+
+
+def create_problem(rng):
+
+    # integer nutrients and prices, so that the brute force compares them exactly;
+    # the bands are built around a random set, so every problem has a set
+
+    nutrient_matrix = rng.integers(0, 50, size=(N_DISHES, 4)).astype(np.float64)
+    price_vec = rng.integers(10, 100, size=N_DISHES).astype(np.float64)
+    quantity_vec = rng.integers(1, MAX_QUANTITY + 1, size=N_DISHES)
+
+    row_vec = nutrient_matrix.T @ rng.integers(0, quantity_vec + 1)
+
+    return nutrient_matrix, price_vec, quantity_vec, row_vec - 20, row_vec + 20
+
+
+def get_brute_force_prices(nutrient_matrix, price_vec, quantity_vec, lower_vec, upper_vec):
+
+    # prices of all sets within the bands, the cheapest first
+
+    price_list = []
+
+    for dish_tuple in itertools.product(*[range(quantity + 1) for quantity in quantity_vec]):
+
+        row_vec = nutrient_matrix.T @ np.array(dish_tuple)
+
+        if np.all(row_vec >= lower_vec) and np.all(row_vec <= upper_vec):
+            price_list.append(float(price_vec @ np.array(dish_tuple)))
+
+    return sorted(price_list)
+
+
+def is_in_bands(dish_vec, problem):
+
+    nutrient_matrix, _, quantity_vec, lower_vec, upper_vec = problem
+
+    row_vec = nutrient_matrix.T @ dish_vec
+
+    return bool(
+        np.all(dish_vec >= 0) and np.all(dish_vec <= quantity_vec) and
+        np.all(row_vec >= lower_vec) and np.all(row_vec <= upper_vec)
+    )
+
+
+def create_optimizer(solver_mode, lower_vec, upper_vec):
+
+    return Optimizer(
+        telegram_handler=SilentTelegramHandler(),
+        n_days=1,
+        calories_lower=lower_vec[0],
+        calories_upper=upper_vec[0],
+        proteins_lower=lower_vec[1],
+        proteins_upper=upper_vec[1],
+        fats_lower=lower_vec[2],
+        fats_upper=upper_vec[2],
+        carbo_lower=lower_vec[3],
+        carbo_upper=upper_vec[3],
+        start_min_price=MAX_PRICE,
+        solver_mode=solver_mode,
+        sample_subsets=True,
+        sampling="uniform",
+        seed=0,
+        n_workers=1,
+        n_solutions=1,
+        time_budget=None,
+        solution_cache=None,
+        pareto_front=None,
+        plan_store=None
+    )
+
+
+class SolversTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.default_rng(0)
+
+        self.problem_list = [create_problem(rng) for _ in range(N_PROBLEMS)]
+
+    def test_integer_solver(self):
+
+        for problem in self.problem_list:
+
+            integer_solver = IntegerSolver(*problem)
+
+            dish_vec, min_price = integer_solver.solve(MAX_PRICE)
+
+            self.assertEqual(min_price, get_brute_force_prices(*problem)[0])
+            self.assertTrue(is_in_bands(dish_vec, problem))
+            self.assertTrue(integer_solver.is_optimal)
+
+    def test_integer_solver_k_best(self):
+
+        # the kept sets are distinct, so their prices are the cheapest prices of all sets with repeats
+
+        for problem in self.problem_list:
+
+            integer_solver = IntegerSolver(*problem, n_solutions=N_SOLUTIONS)
+
+            integer_solver.solve(MAX_PRICE)
+
+            self.assertEqual(
+                [price for _, price in integer_solver.solution_list],
+                get_brute_force_prices(*problem)[:N_SOLUTIONS]
+            )
+
+            for dish_vec, _ in integer_solver.solution_list:
+                self.assertTrue(is_in_bands(dish_vec, problem))
+
+    def test_meet_in_middle_solver(self):
+
+        for problem in self.problem_list:
+
+            dish_vec, min_price = MeetInMiddleSolver(*problem).solve(MAX_PRICE)
+
+            self.assertEqual(min_price, get_brute_force_prices(*problem)[0])
+            self.assertTrue(is_in_bands(dish_vec, problem))
+
+    def test_optimizer_modes(self):
+
+        # the bounded search and the plain recursive one of the optimizer on the same problems
+
+        for solver_mode in ("bounded", "recursive"):
+
+            for problem in self.problem_list:
+
+                nutrient_matrix, price_vec, quantity_vec, lower_vec, upper_vec = problem
+
+                sliced_catalog = Catalog.from_food_df(
+                    pd.DataFrame(nutrient_matrix, columns=Optimizer.NUTRIENT_COLUMNS).assign(
+                        price=price_vec,
+                        quantity=quantity_vec,
+                        mass=100,
+                        link=""
+                    )
+                )
+
+                optimizer = create_optimizer(solver_mode, lower_vec, upper_vec)
+
+                optimizer.use_meet_in_middle = False
+
+                dish_vec, min_price = optimizer.solve_subset(sliced_catalog)
+
+                self.assertEqual(min_price, get_brute_force_prices(*problem)[0], solver_mode)
+                self.assertTrue(is_in_bands(dish_vec, problem))
+
+    def test_no_set(self):
+
+        # no set reaches the lower bounds, every solver returns max_price
+
+        nutrient_matrix, price_vec, quantity_vec, lower_vec, upper_vec = self.problem_list[0]
+
+        lower_vec = nutrient_matrix.T @ quantity_vec + 1
+
+        for solver in (
+            IntegerSolver(nutrient_matrix, price_vec, quantity_vec, lower_vec, lower_vec + 20),
+            MeetInMiddleSolver(nutrient_matrix, price_vec, quantity_vec, lower_vec, lower_vec + 20),
+        ):
+            self.assertEqual(solver.solve(MAX_PRICE)[1], MAX_PRICE)
+
+
+if __name__ == "__main__":
+    unittest.main()